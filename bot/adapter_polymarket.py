@@ -1,67 +1,254 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-try:
-    from py_clob_client.client import ClobClient
-    from py_clob_client.clob_types import ApiCreds
-except ImportError:  # pragma: no cover - dependency optional in tests
-    ClobClient = None
-    ApiCreds = None
+from .resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    MarketQuarantine,
+    hedged_call,
+    is_transport_failure,
+)
+
+
+def _import_clob() -> Tuple[Any, Any, Any]:
+    # Deferred: py_clob_client pulls in the web3/crypto stack, which only the
+    # trading loop needs.
+    try:
+        from py_clob_client.client import ClobClient
+        from py_clob_client.clob_types import ApiCreds, PartialCreateOrderOptions
+    except ImportError:  # pragma: no cover - dependency optional in tests
+        return None, None, None
+    return ClobClient, ApiCreds, PartialCreateOrderOptions
 
 
 @dataclass
 class OrderResult:
     order_id: str
     status: str
+    templated: bool = False
+
+
+@dataclass
+class OrderTemplate:
+    # No nonce here: the exchange nonce is an account-level cancel-all
+    # counter, and per-order uniqueness comes from the salt the client
+    # generates while signing.
+    token_id: str
+    tick_size: Optional[str]
+    neg_risk: Optional[bool]
+    base: Dict[str, Any] = field(default_factory=dict)
+    options: Any = None
+    created_at: float = 0.0
+
+    def fill(self, price: float, size: float) -> Dict[str, Any]:
+        order = dict(self.base)
+        order["price"] = str(_round_to_tick(price, self.tick_size))
+        order["size"] = str(size)
+        return order
+
+    def is_fresh(self, now: float, ttl_s: float) -> bool:
+        return now - self.created_at < ttl_s
+
+
+def _round_to_tick(price: float, tick_size: Optional[str]) -> float:
+    if not tick_size:
+        return price
+    tick = float(tick_size)
+    decimals = len(tick_size.split(".", 1)[1]) if "." in tick_size else 0
+    return round(round(price / tick) * tick, decimals)
 
 
 class PolymarketAdapter:
-    def __init__(self, host: str, chain_id: int, creds: Optional[Dict[str, str]] = None) -> None:
-        if ClobClient is None:
+    def __init__(
+        self,
+        host: str,
+        chain_id: int,
+        creds: Optional[Dict[str, str]] = None,
+        hedge_workers: int = 4,
+        breaker_failure_threshold: int = 5,
+        breaker_reset_s: float = 30,
+        quarantine_base_s: float = 5,
+        quarantine_max_s: float = 600,
+        template_ttl_s: float = 60,
+        status_workers: int = 4,
+        client: Any = None,
+    ) -> None:
+        ClobClient, ApiCreds, self._options_cls = _import_clob()
+        if client is not None:
+            self.client = client
+        elif ClobClient is None:
             raise RuntimeError("py_clob_client is not installed")
-        if creds:
+        elif creds:
             api_creds = ApiCreds(creds["api_key"], creds["api_secret"], creds["api_passphrase"])
-        else:
-            api_creds = None
-        if api_creds is not None:
             self.client = ClobClient(host=host, chain_id=chain_id, creds=api_creds)
         else:
             self.client = ClobClient(host=host, chain_id=chain_id)
+        self._templates: Dict[str, OrderTemplate] = {}
+        # Tick sizes change as prices approach 0 or 1, so templates are
+        # rebuilt after this long.
+        self.template_ttl_s = template_ttl_s
+        self._pool = ThreadPoolExecutor(max_workers=hedge_workers) if hedge_workers > 0 else None
+        # Reconciler polls get their own threads so a status batch never
+        # queues book reads (or their hedges) on the scan path.
+        self._status_pool = ThreadPoolExecutor(max_workers=status_workers) if status_workers > 0 else None
+        self._breaker_failure_threshold = breaker_failure_threshold
+        self._breaker_reset_s = breaker_reset_s
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latency: Dict[str, LatencyTracker] = {}
+        self.quarantine = MarketQuarantine(quarantine_base_s, quarantine_max_s)
+
+    def _call(self, endpoint: str, fn: Callable[[], Any], hedge: bool = False) -> Any:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(self._breaker_failure_threshold, self._breaker_reset_s)
+            self._breakers[endpoint] = breaker
+        if not breaker.allow():
+            raise CircuitOpenError(f"circuit open for {endpoint}")
+        tracker = self._latency.setdefault(endpoint, LatencyTracker())
+
+        def timed() -> Any:
+            started = time.perf_counter()
+            try:
+                return fn()
+            finally:
+                tracker.add(time.perf_counter() - started)
+
+        try:
+            if hedge and self._pool is not None:
+                result = hedged_call(self._pool, timed, tracker.quantile(0.95))
+            else:
+                result = timed()
+        except Exception as exc:
+            if is_transport_failure(exc):
+                breaker.record_failure()
+            else:
+                # The endpoint answered; the error belongs to the request.
+                breaker.record_success()
+            raise
+        breaker.record_success()
+        return result
+
+    def close(self) -> None:
+        for pool in (self._pool, self._status_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
 
     def get_markets(self, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
         if hasattr(self.client, "get_markets"):
-            return self.client.get_markets(params or {})
+            return self._call("get_markets", lambda: self.client.get_markets(params or {}))
         return None
 
     def get_order_book(self, token_id: str) -> Any:
         if hasattr(self.client, "get_order_book"):
-            return self.client.get_order_book(token_id)
+            return self._call("get_order_book", lambda: self.client.get_order_book(token_id), hedge=True)
         if hasattr(self.client, "get_orderbook"):
-            return self.client.get_orderbook(token_id)
+            return self._call("get_order_book", lambda: self.client.get_orderbook(token_id), hedge=True)
         raise AttributeError("ClobClient missing get_order_book/get_orderbook")
 
+    def prepare_order_template(self, token_id: str, refresh: bool = False) -> OrderTemplate:
+        # Everything except price and size is resolved here, off the
+        # submit path: tick size and neg-risk flag are otherwise looked up by
+        # the client while signing. `refresh` rebuilds a cached template so it
+        # is still fresh on the next pass.
+        template = self._templates.get(token_id)
+        if template is not None and not refresh and template.is_fresh(time.monotonic(), self.template_ttl_s):
+            return template
+        tick_size = None
+        neg_risk = None
+        if hasattr(self.client, "get_tick_size"):
+            tick_size = str(self.client.get_tick_size(token_id))
+        if hasattr(self.client, "get_neg_risk"):
+            neg_risk = bool(self.client.get_neg_risk(token_id))
+        options = None
+        if self._options_cls is not None and tick_size is not None:
+            options = self._options_cls(tick_size=tick_size, neg_risk=neg_risk)
+        template = OrderTemplate(
+            token_id=token_id,
+            tick_size=tick_size,
+            neg_risk=neg_risk,
+            base={"token_id": token_id, "side": "BUY", "type": "LIMIT"},
+            options=options,
+            created_at=time.monotonic(),
+        )
+        self._templates[token_id] = template
+        return template
+
+    def drop_order_template(self, token_id: str) -> None:
+        self._templates.pop(token_id, None)
+
     def place_limit_buy(self, token_id: str, price: float, size: float) -> OrderResult:
-        response = self.client.create_order(
-            {
+        template = self._templates.get(token_id)
+        if template is not None and not template.is_fresh(time.monotonic(), self.template_ttl_s):
+            self.drop_order_template(token_id)
+            template = None
+        if template is not None:
+            order = template.fill(price, size)
+            try:
+                if template.options is not None:
+                    response = self._call("create_order", lambda: self.client.create_order(order, template.options))
+                else:
+                    response = self._call("create_order", lambda: self.client.create_order(order))
+            except Exception as exc:
+                if "tick" not in str(exc).lower():
+                    raise
+                # The cached tick size went stale; retry once and let the
+                # client resolve it.
+                self.drop_order_template(token_id)
+                return self.place_limit_buy(token_id, price, size)
+        else:
+            order = {
                 "token_id": token_id,
                 "price": str(price),
                 "size": str(size),
                 "side": "BUY",
                 "type": "LIMIT",
             }
-        )
+            response = self._call("create_order", lambda: self.client.create_order(order))
         order_id = response.get("order_id") or response.get("id") or "unknown"
         status = response.get("status") or "submitted"
-        return OrderResult(order_id=order_id, status=status)
+        return OrderResult(order_id=order_id, status=status, templated=template is not None)
 
     def cancel(self, order_id: str) -> Any:
-        return self.client.cancel(order_id)
+        return self._call("cancel", lambda: self.client.cancel(order_id))
 
-    def get_order_status(self, order_id: str) -> Any:
+    def get_order_status(self, order_id: str, hedge: bool = True) -> Any:
         if hasattr(self.client, "get_order"):
-            return self.client.get_order(order_id)
+            return self._call("get_order", lambda: self.client.get_order(order_id), hedge=hedge)
         if hasattr(self.client, "get_order_status"):
-            return self.client.get_order_status(order_id)
+            return self._call("get_order", lambda: self.client.get_order_status(order_id), hedge=hedge)
         raise AttributeError("ClobClient missing get_order/get_order_status")
+
+    def get_trades(self, trade_ids: List[str]) -> List[Dict[str, Any]]:
+        # Trades carry execution prices; the order payload only has the limit.
+        try:
+            from py_clob_client.clob_types import TradeParams
+        except ImportError:  # pragma: no cover - dependency optional in tests
+            return []
+        trades: List[Dict[str, Any]] = []
+        for trade_id in trade_ids:
+            params = TradeParams(id=trade_id)
+            response = self._call("get_trades", lambda params=params: self.client.get_trades(params))
+            if isinstance(response, list):
+                trades.extend(trade for trade in response if isinstance(trade, dict))
+        return trades
+
+    def get_order_statuses(self, order_ids: List[str]) -> Dict[str, Any]:
+        # Batch poll for the fill reconciler; failures are left out of the
+        # result so the caller simply retries those ids on its next tick.
+        # Runs on the status pool and never hedges into the scan pool.
+        def fetch(order_id: str) -> Any:
+            try:
+                return self.get_order_status(order_id, hedge=False)
+            except Exception:
+                return None
+
+        if self._status_pool is not None and len(order_ids) > 1:
+            payloads = list(self._status_pool.map(fetch, order_ids))
+        else:
+            payloads = [fetch(order_id) for order_id in order_ids]
+        return {order_id: payload for order_id, payload in zip(order_ids, payloads) if payload is not None}
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+# Lightweight subcommands. None of them construct the trading client; heavy
+# modules are imported inside the command that needs them.
+
+
+def check_config(argv: Optional[List[str]] = None) -> int:
+    import yaml
+
+    from .config import load_config
+
+    parser = argparse.ArgumentParser(prog="python -m bot check-config", description="Validate config.yaml")
+    parser.add_argument("--config", required=True, help="Path to config.yaml")
+    args = parser.parse_args(argv)
+
+    try:
+        config = load_config(args.config)
+    except (FileNotFoundError, ValueError, KeyError, TypeError, yaml.YAMLError) as exc:
+        print(f"Config invalid: {exc}", file=sys.stderr)
+        return 1
+    trading = config.trading
+    print(f"Config OK: {args.config}")
+    print(f"  clob: {config.clob.host} (chain {config.clob.chain_id})")
+    print(f"  discovery: max_markets={config.discovery.max_markets} multi_outcome={config.discovery.multi_outcome}")
+    print(
+        f"  trading: fee={trading.fee_bps:g}bps slippage={trading.slippage_bps:g}bps "
+        f"min_edge={trading.min_edge_bps:g}bps min_size={trading.min_order_size:g} "
+        f"per_trade={trading.max_notional_per_trade:g} daily={trading.max_daily_notional:g}"
+    )
+    return 0
+
+
+def status(argv: Optional[List[str]] = None) -> int:
+    import sqlite3
+
+    parser = argparse.ArgumentParser(prog="python -m bot status", description="Summarise bot.db")
+    parser.add_argument("--db", default=str(Path("data") / "bot.db"), help="Path to bot.db")
+    args = parser.parse_args(argv)
+
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"Database not found: {db_path}", file=sys.stderr)
+        return 1
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+        def scalar(query: str, params: List[object], table: str) -> object:
+            if table not in tables:
+                return None
+            row = conn.execute(query, params).fetchone()
+            return row[0] if row else None
+
+        last_run = None
+        if "runs" in tables:
+            last_run = conn.execute("SELECT id, started_at, mode FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+        if last_run:
+            print(f"Last run: #{last_run[0]} {last_run[2]} started {last_run[1]}")
+        else:
+            print("Last run: none")
+        for table in ("runs", "opportunity_episodes", "event_opportunities", "orders", "fills", "imbalances"):
+            count = scalar(f"SELECT COUNT(*) FROM {table}", [], table)
+            if count is not None:
+                print(f"  {table}: {count}")
+        open_episodes = scalar(
+            "SELECT COUNT(*) FROM opportunity_episodes WHERE ended_at IS NULL", [], "opportunity_episodes"
+        )
+        if open_episodes:
+            print(f"  open episodes (last checkpoint): {open_episodes}")
+        today = time.strftime("%Y-%m-%d", time.gmtime())
+        notional = scalar("SELECT notional FROM daily_notional WHERE day = ?", [today], "daily_notional")
+        print(f"Daily notional {today}: {float(notional or 0):.2f}")
+        rolled = scalar("SELECT value FROM maintenance_state WHERE key = 'rollup_hourly'", [], "maintenance_state")
+        if rolled:
+            print(f"Rolled up through hour starting {rolled}")
+    finally:
+        conn.close()
+    return 0
+
+
+def discover(argv: Optional[List[str]] = None) -> int:
+    from .config import load_config, load_env_creds
+    from .market_discovery import build_related_index, discover_complete_events, discover_markets, fetch_markets
+
+    parser = argparse.ArgumentParser(prog="python -m bot discover", description="List markets discovery would scan")
+    parser.add_argument("--config", help="Path to config.yaml")
+    parser.add_argument("--dry", action="store_true", help="HTTP listing only; never build the CLOB client")
+    parser.add_argument("--limit", type=int, default=50, help="Markets to print")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    adapter = None
+    if not args.dry:
+        from .adapter_polymarket import PolymarketAdapter
+
+        creds = load_env_creds()
+        has_creds = bool(creds.get("api_key") and creds.get("api_secret") and creds.get("api_passphrase"))
+        adapter = PolymarketAdapter(config.clob.host, config.clob.chain_id, creds if has_creds else None)
+
+    raw_markets = fetch_markets(config.discovery, adapter=adapter, host=config.clob.host)
+    markets = discover_markets(config.discovery, raw_markets=raw_markets)
+    events = []
+    if config.discovery.multi_outcome:
+        events = discover_complete_events(config.discovery, raw_markets, config.clob.host)
+    related = build_related_index(markets) if config.discovery.related_markets else []
+    print(
+        f"{len(raw_markets)} listed, {len(markets)} binary markets, {len(events)} multi-outcome events, "
+        f"{len(related)} related groups"
+    )
+    for market in markets[: args.limit]:
+        print(f"  {market.market_id}  {market.question}")
+    for event in events[: args.limit]:
+        print(f"  [event {event.event_id}] {event.title} ({len(event.outcomes)} outcomes)")
+    for group in related[: args.limit]:
+        print(f"  [{group.kind} {group.key}] {', '.join(market.market_id for market in group.markets)}")
+    if adapter is not None:
+        adapter.close()
+    return 0
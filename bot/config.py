@@ -24,6 +24,8 @@ class DiscoveryConfig:
     categories: List[str]
     min_liquidity: float
     only_active: bool
+    multi_outcome: bool
+    related_markets: bool
 
 
 @dataclass
@@ -38,12 +40,50 @@ class TradingConfig:
     cooldown_ms_per_market: int
     max_slippage_live_bps: float
     cancel_on_shutdown: bool
+    template_window_bps: float
+    template_ttl_s: float
+    scan_interval_s: float
+    related_max_skew_s: float
+    episode_price_bucket: float
+    episode_checkpoint_s: float
+
+
+@dataclass
+class ResilienceConfig:
+    hedge_workers: int
+    breaker_failure_threshold: int
+    breaker_reset_s: float
+    quarantine_base_s: float
+    quarantine_max_s: float
+
+
+@dataclass
+class ReconcilerConfig:
+    poll_min_s: float
+    poll_max_s: float
+    order_ttl_s: float
+    status_workers: int
+
+
+@dataclass
+class MaintenanceConfig:
+    enabled: bool
+    retention_days: float
+    chunk_rows: int
+    interval_s: float
+    vacuum_pages: int
 
 
 @dataclass
 class LoggingConfig:
     level: str
     jsonl: bool
+    max_bytes: int
+    rotate_interval_s: float
+    backup_count: int
+    compress: bool
+    rate_limit_per_window: int
+    rate_limit_window_s: float
 
 
 @dataclass
@@ -51,6 +91,9 @@ class AppConfig:
     clob: ClobConfig
     discovery: DiscoveryConfig
     trading: TradingConfig
+    resilience: ResilienceConfig
+    reconciler: ReconcilerConfig
+    maintenance: MaintenanceConfig
     logging: LoggingConfig
 
 
@@ -64,6 +107,8 @@ DEFAULT_CONFIG = {
         "categories": [],
         "min_liquidity": 0,
         "only_active": True,
+        "multi_outcome": True,
+        "related_markets": True,
     },
     "trading": {
         "fee_bps": 100,
@@ -76,8 +121,38 @@ DEFAULT_CONFIG = {
         "cooldown_ms_per_market": 30000,
         "max_slippage_live_bps": 150,
         "cancel_on_shutdown": True,
+        "template_window_bps": 50,
+        "template_ttl_s": 180,
+        "scan_interval_s": 60,
+        "related_max_skew_s": 5,
+        "episode_price_bucket": 0.005,
+        "episode_checkpoint_s": 300,
+    },
+    "resilience": {
+        "hedge_workers": 4,
+        "breaker_failure_threshold": 5,
+        "breaker_reset_s": 30,
+        "quarantine_base_s": 5,
+        "quarantine_max_s": 600,
+    },
+    "reconciler": {"poll_min_s": 0.5, "poll_max_s": 30, "order_ttl_s": 60, "status_workers": 4},
+    "maintenance": {
+        "enabled": True,
+        "retention_days": 30,
+        "chunk_rows": 500,
+        "interval_s": 60,
+        "vacuum_pages": 200,
+    },
+    "logging": {
+        "level": "INFO",
+        "jsonl": True,
+        "max_bytes": 50_000_000,
+        "rotate_interval_s": 86400,
+        "backup_count": 7,
+        "compress": True,
+        "rate_limit_per_window": 20,
+        "rate_limit_window_s": 60,
     },
-    "logging": {"level": "INFO", "jsonl": True},
 }
 
 
@@ -105,9 +180,12 @@ def load_config(path: Optional[str]) -> AppConfig:
     clob = config_data["clob"]
     discovery = config_data["discovery"]
     trading = config_data["trading"]
+    resilience = config_data["resilience"]
+    reconciler = config_data["reconciler"]
+    maintenance = config_data["maintenance"]
     logging_cfg = config_data["logging"]
 
-    return AppConfig(
+    config = AppConfig(
         clob=ClobConfig(host=clob["host"], chain_id=int(clob["chain_id"])),
         discovery=DiscoveryConfig(
             max_markets=int(discovery["max_markets"]),
@@ -117,6 +195,8 @@ def load_config(path: Optional[str]) -> AppConfig:
             categories=list(discovery.get("categories", [])),
             min_liquidity=float(discovery.get("min_liquidity", 0)),
             only_active=bool(discovery.get("only_active", True)),
+            multi_outcome=bool(discovery.get("multi_outcome", True)),
+            related_markets=bool(discovery.get("related_markets", True)),
         ),
         trading=TradingConfig(
             fee_bps=float(trading["fee_bps"]),
@@ -129,9 +209,74 @@ def load_config(path: Optional[str]) -> AppConfig:
             cooldown_ms_per_market=int(trading["cooldown_ms_per_market"]),
             max_slippage_live_bps=float(trading["max_slippage_live_bps"]),
             cancel_on_shutdown=bool(trading.get("cancel_on_shutdown", True)),
+            template_window_bps=float(trading.get("template_window_bps", 50)),
+            template_ttl_s=float(trading.get("template_ttl_s", 180)),
+            scan_interval_s=float(trading["scan_interval_s"]),
+            related_max_skew_s=float(trading.get("related_max_skew_s", 5)),
+            episode_price_bucket=float(trading["episode_price_bucket"]),
+            episode_checkpoint_s=float(trading["episode_checkpoint_s"]),
+        ),
+        resilience=ResilienceConfig(
+            hedge_workers=int(resilience["hedge_workers"]),
+            breaker_failure_threshold=int(resilience["breaker_failure_threshold"]),
+            breaker_reset_s=float(resilience["breaker_reset_s"]),
+            quarantine_base_s=float(resilience["quarantine_base_s"]),
+            quarantine_max_s=float(resilience["quarantine_max_s"]),
+        ),
+        reconciler=ReconcilerConfig(
+            poll_min_s=float(reconciler["poll_min_s"]),
+            poll_max_s=float(reconciler["poll_max_s"]),
+            order_ttl_s=float(reconciler["order_ttl_s"]),
+            status_workers=int(reconciler.get("status_workers", 4)),
+        ),
+        maintenance=MaintenanceConfig(
+            enabled=bool(maintenance["enabled"]),
+            retention_days=float(maintenance["retention_days"]),
+            chunk_rows=int(maintenance["chunk_rows"]),
+            interval_s=float(maintenance["interval_s"]),
+            vacuum_pages=int(maintenance["vacuum_pages"]),
+        ),
+        logging=LoggingConfig(
+            level=logging_cfg["level"],
+            jsonl=bool(logging_cfg["jsonl"]),
+            max_bytes=int(logging_cfg["max_bytes"]),
+            rotate_interval_s=float(logging_cfg["rotate_interval_s"]),
+            backup_count=int(logging_cfg["backup_count"]),
+            compress=bool(logging_cfg["compress"]),
+            rate_limit_per_window=int(logging_cfg["rate_limit_per_window"]),
+            rate_limit_window_s=float(logging_cfg["rate_limit_window_s"]),
         ),
-        logging=LoggingConfig(level=logging_cfg["level"], jsonl=bool(logging_cfg["jsonl"])),
     )
+    validate_config(config)
+    return config
+
+
+def validate_config(config: AppConfig) -> None:
+    errors = []
+    if config.discovery.max_markets <= 0:
+        errors.append("discovery.max_markets must be positive")
+    if config.discovery.min_volume_usd < 0 or config.discovery.min_liquidity < 0:
+        errors.append("discovery.min_volume_usd and min_liquidity must not be negative")
+    trading = config.trading
+    if trading.fee_bps < 0 or trading.slippage_bps < 0:
+        errors.append("trading.fee_bps and slippage_bps must not be negative")
+    if trading.min_order_size <= 0:
+        errors.append("trading.min_order_size must be positive")
+    if trading.max_notional_per_trade <= 0 or trading.max_daily_notional <= 0:
+        errors.append("trading.max_notional_per_trade and max_daily_notional must be positive")
+    if trading.max_open_orders <= 0:
+        errors.append("trading.max_open_orders must be positive")
+    if trading.cooldown_ms_per_market < 0 or trading.scan_interval_s < 0:
+        errors.append("trading.cooldown_ms_per_market and scan_interval_s must not be negative")
+    if trading.template_ttl_s <= trading.scan_interval_s:
+        # Templates warmed on one pass are used on the next one.
+        errors.append("trading.template_ttl_s must be longer than scan_interval_s")
+    if trading.related_max_skew_s < 0:
+        errors.append("trading.related_max_skew_s must not be negative")
+    if trading.episode_price_bucket < 0:
+        errors.append("trading.episode_price_bucket must not be negative")
+    if errors:
+        raise ValueError("Invalid config: " + "; ".join(errors))
 
 
 def load_env_creds() -> Dict[str, Optional[str]]:
@@ -1,20 +1,46 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, List, Optional
+
+
+TIME_COLUMNS = {
+    "runs": "started_at",
+    "opportunities": "created_at",
+    "opportunity_episodes": "started_at",
+    "event_opportunities": "created_at",
+    "related_opportunities": "created_at",
+    "orders": "created_at",
+    "fills": "filled_at",
+    "imbalances": "created_at",
+}
+
+RUN_TABLES = (
+    "opportunities",
+    "opportunity_episodes",
+    "event_opportunities",
+    "related_opportunities",
+    "orders",
+    "imbalances",
+)
 
 
 class BotDB:
     def __init__(self, path: Path) -> None:
         self.path = path
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        self.conn = sqlite3.connect(self.path)
+        # Shared with the fill reconciler thread; every statement holds the lock.
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
         self._init_schema()
 
     def _init_schema(self) -> None:
         cursor = self.conn.cursor()
+        # Only takes effect on a new file; see DBMaintenance for existing ones.
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
         cursor.execute(
             """
             CREATE TABLE IF NOT EXISTS runs (
@@ -39,6 +65,55 @@ class BotDB:
             )
             """
         )
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS opportunity_episodes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id INTEGER,
+                market_id TEXT,
+                yes_token_id TEXT,
+                no_token_id TEXT,
+                yes_ask REAL,
+                no_ask REAL,
+                peak_edge_bps REAL,
+                mean_edge_bps REAL,
+                max_size REAL,
+                sightings INTEGER,
+                started_at TEXT,
+                ended_at TEXT
+            )
+            """
+        )
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS event_opportunities (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id INTEGER,
+                event_id TEXT,
+                legs INTEGER,
+                ask_sum REAL,
+                edge_bps REAL,
+                depth_size REAL,
+                depth_cost REAL,
+                created_at TEXT
+            )
+            """
+        )
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS related_opportunities (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id INTEGER,
+                kind TEXT,
+                group_key TEXT,
+                legs TEXT,
+                ask_sum REAL,
+                payout REAL,
+                edge_bps REAL,
+                created_at TEXT
+            )
+            """
+        )
         cursor.execute(
             """
             CREATE TABLE IF NOT EXISTS orders (
@@ -62,10 +137,12 @@ class BotDB:
                 token_id TEXT,
                 price REAL,
                 size REAL,
-                filled_at TEXT
+                filled_at TEXT,
+                price_source TEXT
             )
             """
         )
+        self._ensure_column(cursor, "fills", "price_source", "TEXT")
         cursor.execute(
             """
             CREATE TABLE IF NOT EXISTS imbalances (
@@ -88,29 +165,92 @@ class BotDB:
             )
             """
         )
+        for table in ("rollup_hourly", "rollup_daily"):
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    bucket TEXT NOT NULL,
+                    market_id TEXT NOT NULL,
+                    opportunities INTEGER,
+                    sightings INTEGER,
+                    edge_p50_bps REAL,
+                    edge_p90_bps REAL,
+                    edge_max_bps REAL,
+                    orders INTEGER,
+                    filled_orders INTEGER,
+                    fill_rate REAL,
+                    PRIMARY KEY (bucket, market_id)
+                )
+                """
+            )
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS maintenance_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+            """
+        )
+        for table, column in TIME_COLUMNS.items():
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})")
+        # Per-run reports and exports filter on run_id.
+        for table in RUN_TABLES:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_run_id ON {table} (run_id)")
         self.conn.commit()
 
+    @staticmethod
+    def _ensure_column(cursor: sqlite3.Cursor, table: str, column: str, kind: str) -> None:
+        # Columns added after a table shipped; CREATE TABLE IF NOT EXISTS
+        # leaves existing files without them.
+        columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+
     def insert(self, table: str, data: Dict[str, Any]) -> int:
         keys = ", ".join(data.keys())
         placeholders = ", ".join(["?"] * len(data))
         values = list(data.values())
-        cursor = self.conn.cursor()
-        cursor.execute(
-            f"INSERT INTO {table} ({keys}) VALUES ({placeholders})",
-            values,
-        )
-        self.conn.commit()
-        return int(cursor.lastrowid)
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                f"INSERT INTO {table} ({keys}) VALUES ({placeholders})",
+                values,
+            )
+            self.conn.commit()
+            return int(cursor.lastrowid)
+
+    def update(self, table: str, row_id: int, data: Dict[str, Any]) -> None:
+        assignments = ", ".join(f"{key} = ?" for key in data)
+        self.execute(f"UPDATE {table} SET {assignments} WHERE id = ?", [*data.values(), row_id])
 
     def fetch_one(self, query: str, params: Iterable[Any]) -> Optional[sqlite3.Row]:
-        cursor = self.conn.cursor()
-        cursor.execute(query, params)
-        return cursor.fetchone()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute(query, params)
+            return cursor.fetchone()
 
-    def execute(self, query: str, params: Iterable[Any]) -> None:
-        cursor = self.conn.cursor()
-        cursor.execute(query, params)
-        self.conn.commit()
+    def fetch_all(self, query: str, params: Iterable[Any]) -> List[sqlite3.Row]:
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+    def execute(self, query: str, params: Iterable[Any]) -> int:
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute(query, params)
+            self.conn.commit()
+            return cursor.rowcount
+
+    def executemany(self, query: str, rows: Iterable[Iterable[Any]]) -> None:
+        with self._lock:
+            self.conn.executemany(query, rows)
+            self.conn.commit()
+
+    def incremental_vacuum(self, pages: int) -> None:
+        # execute() only steps the pragma once (one page); a script runs it out.
+        with self._lock:
+            self.conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
 
     def close(self) -> None:
         self.conn.close()
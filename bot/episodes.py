@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .db import BotDB
+from .scanner import Opportunity
+
+
+def _iso(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+
+
+@dataclass
+class OpportunityEpisode:
+    market_id: str
+    yes_token_id: str
+    no_token_id: str
+    started_at: float
+    last_seen_at: float
+    yes_ask: float
+    no_ask: float
+    peak_edge_bps: float
+    edge_sum_bps: float
+    max_size: float
+    sightings: int
+    row_id: Optional[int] = None
+    checkpointed_at: Optional[float] = None
+
+    @property
+    def mean_edge_bps(self) -> float:
+        return self.edge_sum_bps / self.sightings if self.sightings else 0.0
+
+
+class EpisodeTracker:
+    # One persistent edge is one episode: sightings of the same market in the
+    # same price bucket fold into it, and it is written when it stops being
+    # seen (plus periodic checkpoints while it stays open).
+    def __init__(
+        self,
+        db: BotDB,
+        run_id: int,
+        price_bucket: float,
+        checkpoint_s: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.db = db
+        self.run_id = run_id
+        self.price_bucket = price_bucket
+        self.checkpoint_s = checkpoint_s
+        self._clock = clock
+        self._open: Dict[Tuple[str, int], OpportunityEpisode] = {}
+        self._seen: set = set()
+
+    def _key(self, opportunity: Opportunity) -> Tuple[str, int]:
+        cost = opportunity.yes.price + opportunity.no.price
+        bucket = int(round(cost / self.price_bucket)) if self.price_bucket > 0 else 0
+        return opportunity.market.market_id, bucket
+
+    def observe(self, opportunity: Opportunity) -> OpportunityEpisode:
+        now = self._clock()
+        key = self._key(opportunity)
+        size = min(opportunity.yes.size, opportunity.no.size)
+        self._seen.add(key)
+        episode = self._open.get(key)
+        if episode is None:
+            episode = OpportunityEpisode(
+                market_id=opportunity.market.market_id,
+                yes_token_id=opportunity.market.yes_token_id,
+                no_token_id=opportunity.market.no_token_id,
+                started_at=now,
+                last_seen_at=now,
+                yes_ask=opportunity.yes.price,
+                no_ask=opportunity.no.price,
+                peak_edge_bps=opportunity.edge_bps,
+                edge_sum_bps=opportunity.edge_bps,
+                max_size=size,
+                sightings=1,
+            )
+            self._open[key] = episode
+            return episode
+        episode.last_seen_at = now
+        episode.sightings += 1
+        episode.edge_sum_bps += opportunity.edge_bps
+        episode.max_size = max(episode.max_size, size)
+        if opportunity.edge_bps > episode.peak_edge_bps:
+            episode.peak_edge_bps = opportunity.edge_bps
+            episode.yes_ask = opportunity.yes.price
+            episode.no_ask = opportunity.no.price
+        return episode
+
+    def end_pass(self) -> List[OpportunityEpisode]:
+        closed = [key for key in self._open if key not in self._seen]
+        self._seen = set()
+        episodes = [self._close(key) for key in closed]
+        now = self._clock()
+        for episode in self._open.values():
+            since = episode.checkpointed_at if episode.checkpointed_at is not None else episode.started_at
+            if now - since >= self.checkpoint_s:
+                self._write(episode, closed=False)
+                episode.checkpointed_at = now
+        return episodes
+
+    def close_all(self) -> List[OpportunityEpisode]:
+        self._seen = set()
+        return [self._close(key) for key in list(self._open)]
+
+    @property
+    def open_count(self) -> int:
+        return len(self._open)
+
+    def _close(self, key: Tuple[str, int]) -> OpportunityEpisode:
+        episode = self._open.pop(key)
+        self._write(episode, closed=True)
+        return episode
+
+    def _write(self, episode: OpportunityEpisode, closed: bool) -> None:
+        row = {
+            "run_id": self.run_id,
+            "market_id": episode.market_id,
+            "yes_token_id": episode.yes_token_id,
+            "no_token_id": episode.no_token_id,
+            "yes_ask": episode.yes_ask,
+            "no_ask": episode.no_ask,
+            "peak_edge_bps": episode.peak_edge_bps,
+            "mean_edge_bps": episode.mean_edge_bps,
+            "max_size": episode.max_size,
+            "sightings": episode.sightings,
+            "started_at": _iso(episode.started_at),
+            "ended_at": _iso(episode.last_seen_at) if closed else None,
+        }
+        if episode.row_id is None:
+            episode.row_id = self.db.insert("opportunity_episodes", row)
+        else:
+            self.db.update("opportunity_episodes", episode.row_id, row)
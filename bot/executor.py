@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import time
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from .adapter_polymarket import PolymarketAdapter
 from .db import BotDB
@@ -10,11 +10,16 @@ from .market_discovery import MarketInfo
 from .risk import RiskLimits, add_daily_notional, check_daily_limit, check_trade_limits
 from .scanner import Opportunity
 
+if TYPE_CHECKING:
+    from .reconciler import FillReconciler
+
 
 @dataclass
 class ExecutionResult:
     success: bool
     message: str
+    submit_latency_ms: Optional[float] = None
+    templated: bool = False
 
 
 def execute_opportunity(
@@ -24,17 +29,26 @@ def execute_opportunity(
     limits: RiskLimits,
     run_id: int,
     max_slippage_live_bps: float,
+    reconciler: Optional["FillReconciler"] = None,
 ) -> ExecutionResult:
-    notional = opportunity.yes.price + opportunity.no.price
-    if not check_trade_limits(notional, 0, limits):
+    # One pair is min_order_size shares of each leg.
+    notional = (opportunity.yes.price + opportunity.no.price) * limits.min_order_size
+    if reconciler is not None and reconciler.has_imbalance(opportunity.market.market_id):
+        # Unhedged shares are already held here; another pair could widen the gap.
+        return ExecutionResult(False, "open imbalance on market")
+    open_orders = reconciler.open_order_count if reconciler is not None else 0
+    pending = reconciler.pending_notional if reconciler is not None else 0.0
+    if not check_trade_limits(notional, open_orders, limits):
         return ExecutionResult(False, "risk limits exceeded")
-    if not check_daily_limit(db, notional, limits):
+    if not check_daily_limit(db, notional + pending, limits):
         return ExecutionResult(False, "daily notional exceeded")
 
     yes_order = adapter.place_limit_buy(opportunity.market.yes_token_id, opportunity.yes.price, limits.min_order_size)
     no_order = adapter.place_limit_buy(opportunity.market.no_token_id, opportunity.no.price, limits.min_order_size)
+    submit_latency_ms = (time.perf_counter() - opportunity.detected_at) * 1000 if opportunity.detected_at else None
+    templated = yes_order.templated and no_order.templated
 
-    db.insert(
+    yes_row_id = db.insert(
         "orders",
         {
             "run_id": run_id,
@@ -47,7 +61,7 @@ def execute_opportunity(
             "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         },
     )
-    db.insert(
+    no_row_id = db.insert(
         "orders",
         {
             "run_id": run_id,
@@ -61,6 +75,21 @@ def execute_opportunity(
         },
     )
 
+    if reconciler is not None:
+        market = opportunity.market
+        size = limits.min_order_size
+        reconciler.track_pair(
+            run_id,
+            market.market_id,
+            market.yes_token_id,
+            market.no_token_id,
+            [
+                (yes_order.order_id, yes_row_id, market.yes_token_id, opportunity.yes.price, size),
+                (no_order.order_id, no_row_id, market.no_token_id, opportunity.no.price, size),
+            ],
+        )
+        return ExecutionResult(True, "orders submitted; fills reconciled in background", submit_latency_ms, templated)
+
     time.sleep(1)
     yes_status = adapter.get_order_status(yes_order.order_id)
     no_status = adapter.get_order_status(no_order.order_id)
@@ -70,7 +99,7 @@ def execute_opportunity(
 
     if yes_filled and no_filled:
         add_daily_notional(db, notional)
-        return ExecutionResult(True, "both legs filled")
+        return ExecutionResult(True, "both legs filled", submit_latency_ms, templated)
 
     if yes_filled != no_filled:
         unfilled_order_id = no_order.order_id if yes_filled else yes_order.order_id
@@ -86,7 +115,7 @@ def execute_opportunity(
                 "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
             },
         )
-        return ExecutionResult(False, "partial fill; imbalance recorded")
+        return ExecutionResult(False, "partial fill; imbalance recorded", submit_latency_ms, templated)
 
     max_slippage = max_slippage_live_bps / 10000
     retry_yes_price = opportunity.yes.price * (1 + max_slippage)
@@ -104,7 +133,7 @@ def execute_opportunity(
             "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         },
     )
-    return ExecutionResult(False, "no fills; retried with slippage")
+    return ExecutionResult(False, "no fills; retried with slippage", submit_latency_ms, templated)
 
 
 def _is_filled(status_payload: Optional[object]) -> bool:
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .config import AppConfig, DiscoveryConfig, load_config
+
+logger = logging.getLogger("bot")
+
+# Sections bound to live objects (client, log handlers, threads) at startup;
+# changes to them are reported and ignored until restart.
+RESTART_SECTIONS = ("clob", "resilience", "reconciler", "maintenance", "logging")
+
+# Discovery fields that change what is fetched rather than how the fetched
+# set is filtered.
+FETCH_FIELDS = ("max_markets", "only_active")
+
+
+class ConfigReloader:
+    def __init__(self, path: Optional[str], current: AppConfig, watch: bool = False) -> None:
+        self.path = path
+        self.current = current
+        self.watch = watch
+        self._requested = False
+        self._mtime = self._read_mtime()
+
+    def request(self, *_: object) -> None:
+        # Safe to use as a signal handler: only sets a flag.
+        self._requested = True
+
+    def _read_mtime(self) -> Optional[float]:
+        if not self.path:
+            return None
+        try:
+            return Path(self.path).stat().st_mtime
+        except OSError:
+            return None
+
+    def poll(self) -> Optional[AppConfig]:
+        if self.watch and not self._requested:
+            mtime = self._read_mtime()
+            if mtime is not None and mtime != self._mtime:
+                self._requested = True
+        if not self._requested:
+            return None
+        self._requested = False
+        self._mtime = self._read_mtime()
+        try:
+            loaded = load_config(self.path)
+        except Exception as exc:
+            logger.error("Config reload rejected, keeping current settings: %s", exc)
+            return None
+
+        frozen = {}
+        for section in RESTART_SECTIONS:
+            if getattr(loaded, section) != getattr(self.current, section):
+                logger.warning("Config section '%s' changed; it takes effect after a restart", section)
+            frozen[section] = getattr(self.current, section)
+        new_config = dataclasses.replace(loaded, **frozen)
+        if new_config == self.current:
+            logger.info("Config reloaded; no changes")
+            return None
+        # Not committed here: the caller may still reject it (e.g. a failed
+        # market refetch) and a later reload of the same file must retry.
+        return new_config
+
+    def commit(self, applied: AppConfig) -> None:
+        self.current = applied
+
+
+def discovery_changes(old: DiscoveryConfig, new: DiscoveryConfig) -> Tuple[List[str], bool]:
+    names = [field.name for field in dataclasses.fields(DiscoveryConfig)]
+    changed = [name for name in names if getattr(old, name) != getattr(new, name)]
+    return changed, any(name in FETCH_FIELDS for name in changed)
@@ -1,26 +1,156 @@
 from __future__ import annotations
 
+import atexit
+import copy
+import gzip
 import json
 import logging
-from datetime import datetime
+import os
+import queue
+import shutil
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+_EXC_FORMATTER = logging.Formatter()
+_listener: Optional[QueueListener] = None
 
 
 class JsonlFormatter(logging.Formatter):
+    def __init__(self) -> None:
+        super().__init__()
+        self._cached_second = -1
+        self._cached_prefix = ""
+
+    def _timestamp(self, created: float) -> str:
+        second = int(created)
+        if second != self._cached_second:
+            self._cached_second = second
+            self._cached_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        return f"{self._cached_prefix}.{int((created - second) * 1000):03d}Z"
+
     def format(self, record: logging.LogRecord) -> str:
         payload: Dict[str, Any] = {
-            "time": datetime.utcnow().isoformat() + "Z",
+            "time": self._timestamp(record.created),
             "level": record.levelname,
             "name": record.name,
             "message": record.getMessage(),
         }
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            payload["suppressed"] = suppressed
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+        if orjson is not None:
+            return orjson.dumps(payload).decode("utf-8")
+        return _JSON_ENCODER.encode(payload)
+
+
+class RateLimitFilter(logging.Filter):
+    # Applies to records logged with extra={"throttle": True}: at most `limit`
+    # per message template per window, ERROR and above always pass. The drop
+    # count rides on the next record that gets through.
+    def __init__(self, limit: int, window_s: float) -> None:
+        super().__init__()
+        self.limit = limit
+        self.window_s = window_s
+        self._buckets: Dict[Tuple[str, Any], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0 or record.levelno >= logging.ERROR or not getattr(record, "throttle", False):
+            return True
+        key = (record.name, record.msg)
+        now = record.created
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or now - bucket[0] >= self.window_s:
+                suppressed = bucket[2] if bucket is not None else 0
+                self._buckets[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if bucket[1] < self.limit:
+                bucket[1] += 1
+                return True
+            bucket[2] += 1
+            return False
+
+
+class SizeTimeRotatingFileHandler(RotatingFileHandler):
+    def __init__(
+        self,
+        filename: Path,
+        max_bytes: int,
+        interval_s: float,
+        backup_count: int,
+        compress: bool,
+    ) -> None:
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self.interval_s = interval_s
+        self._rollover_at = time.time() + interval_s if interval_s > 0 else None
+        if compress:
+            self.namer = _gzip_namer
+            self.rotator = _gzip_rotator
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self._rollover_at is not None and record.created >= self._rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        if self._rollover_at is not None:
+            self._rollover_at = time.time() + self.interval_s
+
+
+class _QueueHandler(QueueHandler):
+    # The stock prepare() runs the full formatter on the calling thread; only
+    # merge args and render the traceback so the listener does the rest.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
         if record.exc_info:
-            payload["exception"] = self.formatException(record.exc_info)
-        return json.dumps(payload, ensure_ascii=False)
+            record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _gzip_namer(name: str) -> str:
+    return name + ".gz"
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
 
+def setup_logging(
+    level: str,
+    jsonl_enabled: bool,
+    max_bytes: int = 50_000_000,
+    rotate_interval_s: float = 86400,
+    backup_count: int = 7,
+    compress: bool = True,
+    rate_limit_per_window: int = 20,
+    rate_limit_window_s: float = 60,
+) -> logging.Logger:
+    global _listener
 
-def setup_logging(level: str, jsonl_enabled: bool) -> logging.Logger:
+    shutdown_logging()
     logger = logging.getLogger("bot")
     logger.setLevel(level.upper())
     logger.handlers.clear()
@@ -29,15 +159,43 @@ def setup_logging(level: str, jsonl_enabled: bool) -> logging.Logger:
     logs_dir = Path("logs")
     logs_dir.mkdir(parents=True, exist_ok=True)
 
+    handlers = []
     console_handler = logging.StreamHandler()
     console_handler.setLevel(level.upper())
     console_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
-    logger.addHandler(console_handler)
+    handlers.append(console_handler)
 
     if jsonl_enabled:
-        json_handler = logging.FileHandler(logs_dir / "bot.jsonl", encoding="utf-8")
+        json_handler = SizeTimeRotatingFileHandler(
+            logs_dir / "bot.jsonl",
+            max_bytes=max_bytes,
+            interval_s=rotate_interval_s,
+            backup_count=backup_count,
+            compress=compress,
+        )
         json_handler.setLevel(level.upper())
         json_handler.setFormatter(JsonlFormatter())
-        logger.addHandler(json_handler)
+        handlers.append(json_handler)
 
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(rate_limit_per_window, rate_limit_window_s))
+    logger.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
     return logger
+
+
+def shutdown_logging() -> None:
+    global _listener
+
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+atexit.register(shutdown_logging)
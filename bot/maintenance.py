@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import calendar
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .db import RUN_TABLES, TIME_COLUMNS, BotDB
+
+logger = logging.getLogger("bot")
+
+ROLLUPS = {"rollup_hourly": 3600, "rollup_daily": 86400}
+FILLED_STATUSES = ("filled", "matched", "complete", "completed")
+
+
+def _iso(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+
+
+def _parse_iso(value: str) -> float:
+    return float(calendar.timegm(time.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")))
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    if len(ordered) == 1:
+        return ordered[0]
+    position = q * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class DBMaintenance:
+    # Keeps bot.db bounded: rolls completed hours/days into rollup tables,
+    # deletes raw rows past retention once they are rolled up, and returns
+    # free pages with incremental vacuum. Every step is one small statement
+    # batch so the shared connection lock is only held briefly.
+    def __init__(
+        self,
+        db: BotDB,
+        retention_days: float,
+        chunk_rows: int,
+        interval_s: float,
+        vacuum_pages: int,
+        grace_s: float = 0.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.db = db
+        self.retention_days = retention_days
+        self.chunk_rows = chunk_rows
+        self.interval_s = interval_s
+        self.vacuum_pages = vacuum_pages
+        # Rows for a bucket keep arriving after it ends (episode checkpoints,
+        # order status updates), so buckets are only rolled up this long
+        # after their end. Pruning follows the rollup watermark.
+        self.grace_s = grace_s
+        self._clock = clock
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        row = db.fetch_one("PRAGMA auto_vacuum", [])
+        self._incremental = row is not None and int(row[0]) == 2
+        if not self._incremental:
+            logger.info("bot.db is not in incremental auto_vacuum mode; run VACUUM once with the bot stopped")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                busy = self.run_step()
+            except Exception as exc:
+                logger.warning("DB maintenance step failed: %s", exc, extra={"throttle": True})
+                busy = False
+            self._stop.wait(0.05 if busy else self.interval_s)
+
+    def run_step(self) -> bool:
+        busy = False
+        for table, span in ROLLUPS.items():
+            busy = self._rollup_next(table, span) or busy
+        cutoff = self._prune_cutoff()
+        if cutoff is not None:
+            for table, column in TIME_COLUMNS.items():
+                busy = self._prune_chunk(table, column, cutoff) or busy
+        if self._incremental and self.vacuum_pages > 0:
+            row = self.db.fetch_one("PRAGMA freelist_count", [])
+            if row is not None and int(row[0]) > 0:
+                self.db.incremental_vacuum(self.vacuum_pages)
+        return busy
+
+    def _state(self, key: str) -> Optional[str]:
+        row = self.db.fetch_one("SELECT value FROM maintenance_state WHERE key = ?", [key])
+        return str(row["value"]) if row else None
+
+    def _set_state(self, key: str, value: str) -> None:
+        self.db.execute("INSERT OR REPLACE INTO maintenance_state (key, value) VALUES (?, ?)", [key, value])
+
+    def _first_activity(self, since: str) -> Optional[str]:
+        firsts = []
+        for query in (
+            "SELECT MIN(started_at) AS t FROM opportunity_episodes WHERE started_at >= ?",
+            "SELECT MIN(created_at) AS t FROM opportunities WHERE created_at >= ?",
+            "SELECT MIN(created_at) AS t FROM orders WHERE created_at >= ?",
+        ):
+            row = self.db.fetch_one(query, [since])
+            if row is not None and row["t"]:
+                firsts.append(str(row["t"]))
+        return min(firsts) if firsts else None
+
+    def _rollup_next(self, table: str, span: int) -> bool:
+        last = self._state(table)
+        start = _parse_iso(last) + span if last else 0.0
+        first = self._first_activity(_iso(start))
+        if first is None:
+            return False
+        # Skip empty periods in one jump instead of one bucket per step.
+        start = max(start, _parse_iso(first) // span * span)
+        end = start + span
+        if end + self.grace_s > self._clock():
+            return False
+        rows = self._aggregate(_iso(start), _iso(end))
+        self.db.executemany(
+            f"""
+            INSERT OR REPLACE INTO {table} (
+                bucket, market_id, opportunities, sightings, edge_p50_bps, edge_p90_bps,
+                edge_max_bps, orders, filled_orders, fill_rate
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(_iso(start), *row) for row in rows],
+        )
+        # Rollups are idempotent per bucket, so a crash before this line only
+        # means the bucket is recomputed.
+        self._set_state(table, _iso(start))
+        return True
+
+    def _aggregate(self, start: str, end: str) -> List[Tuple[Any, ...]]:
+        edges: Dict[str, List[float]] = {}
+        sightings: Dict[str, int] = {}
+        for row in self.db.fetch_all(
+            """
+            SELECT market_id, peak_edge_bps AS edge, sightings FROM opportunity_episodes
+            WHERE started_at >= ? AND started_at < ?
+            UNION ALL
+            SELECT market_id, edge_bps AS edge, 1 AS sightings FROM opportunities
+            WHERE created_at >= ? AND created_at < ?
+            """,
+            [start, end, start, end],
+        ):
+            market_id = str(row["market_id"])
+            edges.setdefault(market_id, []).append(float(row["edge"] or 0.0))
+            sightings[market_id] = sightings.get(market_id, 0) + int(row["sightings"] or 1)
+
+        placeholders = ", ".join("?" * len(FILLED_STATUSES))
+        orders: Dict[str, Tuple[int, int]] = {}
+        for row in self.db.fetch_all(
+            f"""
+            SELECT market_id, COUNT(*) AS total,
+                   SUM(CASE WHEN LOWER(status) IN ({placeholders}) THEN 1 ELSE 0 END) AS filled
+            FROM orders WHERE created_at >= ? AND created_at < ? GROUP BY market_id
+            """,
+            [*FILLED_STATUSES, start, end],
+        ):
+            orders[str(row["market_id"])] = (int(row["total"]), int(row["filled"] or 0))
+
+        rows = []
+        for market_id in sorted(set(edges) | set(orders)):
+            ordered = sorted(edges.get(market_id, []))
+            total, filled = orders.get(market_id, (0, 0))
+            rows.append(
+                (
+                    market_id,
+                    len(ordered),
+                    sightings.get(market_id, 0),
+                    _percentile(ordered, 0.5) if ordered else None,
+                    _percentile(ordered, 0.9) if ordered else None,
+                    ordered[-1] if ordered else None,
+                    total,
+                    filled,
+                    filled / total if total else None,
+                )
+            )
+        return rows
+
+    def _prune_cutoff(self) -> Optional[str]:
+        if self.retention_days <= 0:
+            return None
+        cutoff = self._clock() - self.retention_days * 86400
+        # Never drop raw rows that the rollups have not covered yet.
+        for table, span in ROLLUPS.items():
+            last = self._state(table)
+            if last is None:
+                return None
+            cutoff = min(cutoff, _parse_iso(last) + span)
+        return _iso(cutoff)
+
+    def _prune_chunk(self, table: str, column: str, cutoff: str) -> bool:
+        condition = f"{column} < ?"
+        if table == "opportunity_episodes":
+            condition += " AND ended_at IS NOT NULL"
+        elif table == "runs":
+            # A run row goes only once nothing points at it, and never the
+            # newest run: that is the one a live bot is still writing under.
+            condition += " AND id < (SELECT MAX(id) FROM runs)"
+            condition += "".join(
+                f" AND NOT EXISTS (SELECT 1 FROM {child} WHERE {child}.run_id = runs.id)" for child in RUN_TABLES
+            )
+        deleted = self.db.execute(
+            f"DELETE FROM {table} WHERE id IN (SELECT id FROM {table} WHERE {condition} LIMIT ?)",
+            [cutoff, self.chunk_rows],
+        )
+        return deleted >= self.chunk_rows
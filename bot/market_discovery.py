@@ -1,12 +1,19 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Tuple
-
-import requests
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 from .config import DiscoveryConfig
 
+logger = logging.getLogger("bot")
+
+# Upper bound on pages read from the full CLOB listing when completing
+# neg-risk events; a listing that does not end within it is not trusted.
+MAX_LISTING_PAGES = 200
+END_CURSOR = "LTE="
+
 
 @dataclass
 class MarketInfo:
@@ -17,6 +24,34 @@ class MarketInfo:
     volume: Optional[float]
     liquidity: Optional[float]
     category: Optional[str]
+    event_id: Optional[str] = None
+    condition_id: Optional[str] = None
+    neg_risk: bool = False
+
+
+@dataclass
+class OutcomeToken:
+    label: str
+    token_id: str
+    market_id: str
+
+
+@dataclass
+class EventInfo:
+    event_id: str
+    title: str
+    outcomes: List[OutcomeToken]
+    category: Optional[str]
+
+
+@dataclass
+class RelatedGroup:
+    # kind is "nested" (markets ordered by deadline, each implying the next),
+    # "exclusive" (neg-risk event members, at most one resolves YES) or
+    # "same" (one condition listed more than once).
+    kind: str
+    key: str
+    markets: List[MarketInfo] = field(default_factory=list)
 
 
 def _normalize_text(value: Any) -> str:
@@ -50,6 +85,60 @@ def _extract_tokens(market: Dict[str, Any]) -> Tuple[Optional[str], Optional[str
     return (str(yes_token_id) if yes_token_id else None, str(no_token_id) if no_token_id else None)
 
 
+def _extract_outcome_tokens(market: Dict[str, Any]) -> List[Tuple[str, str]]:
+    outcomes: List[Tuple[str, str]] = []
+    seen = set()
+    for key in ("tokens", "outcomes", "outcomeTokens", "outcome_tokens"):
+        value = market.get(key)
+        if not isinstance(value, list):
+            continue
+        for token in value:
+            if not isinstance(token, dict):
+                continue
+            token_id = token.get("token_id") or token.get("tokenId") or token.get("id")
+            if not token_id or str(token_id) in seen:
+                continue
+            seen.add(str(token_id))
+            label = token.get("outcome") or token.get("name") or token.get("title") or ""
+            outcomes.append((str(label), str(token_id)))
+    return outcomes
+
+
+def _event_id(market: Dict[str, Any]) -> Optional[str]:
+    for key in ("neg_risk_market_id", "negRiskMarketID", "negRiskMarketId", "event_id", "eventId"):
+        if market.get(key):
+            return str(market[key])
+    events = market.get("events")
+    if isinstance(events, list) and events and isinstance(events[0], dict) and events[0].get("id"):
+        return str(events[0]["id"])
+    return None
+
+
+def _event_outcome_count(market: Dict[str, Any]) -> Optional[int]:
+    # Size of the full neg-risk outcome set, when the listing says so.
+    events = market.get("events")
+    if isinstance(events, list) and events and isinstance(events[0], dict):
+        listed = events[0].get("markets")
+        if isinstance(listed, list) and listed:
+            return len(listed)
+        for key in ("marketCount", "market_count"):
+            if events[0].get(key):
+                return int(events[0][key])
+    for key in ("event_market_count", "eventMarketCount"):
+        if market.get(key):
+            return int(market[key])
+    return None
+
+
+def _is_neg_risk(market: Dict[str, Any]) -> bool:
+    return bool(market.get("neg_risk") or market.get("negRisk"))
+
+
+def _market_id(market: Dict[str, Any]) -> str:
+    question = market.get("question") or market.get("title") or market.get("name") or ""
+    return str(market.get("id") or market.get("market_id") or market.get("marketId") or question)
+
+
 def _matches_filters(market: Dict[str, Any], config: DiscoveryConfig) -> bool:
     question = _normalize_text(market.get("question") or market.get("title") or market.get("name"))
     if config.include_keywords:
@@ -93,11 +182,11 @@ def _parse_markets(payload: Any) -> Iterable[Dict[str, Any]]:
     return []
 
 
-def discover_markets(
+def fetch_markets(
     config: DiscoveryConfig,
     adapter: Optional[Any] = None,
     host: str = "https://clob.polymarket.com",
-) -> List[MarketInfo]:
+) -> List[Dict[str, Any]]:
     markets: List[Dict[str, Any]] = []
     if adapter is not None:
         response = adapter.get_markets({"active": True, "limit": config.max_markets})
@@ -105,6 +194,8 @@ def discover_markets(
             markets = list(_parse_markets(response))
 
     if not markets:
+        import requests
+
         params = {"active": "true" if config.only_active else "false", "limit": config.max_markets}
         endpoints = [
             f"{host}/markets",
@@ -120,7 +211,65 @@ def discover_markets(
                     break
             except requests.RequestException:
                 continue
+    return [market for market in markets if isinstance(market, dict)]
+
 
+def incomplete_neg_risk_events(raw_markets: Iterable[Dict[str, Any]]) -> List[str]:
+    # Neg-risk event ids whose full outcome set the listing does not state.
+    counted: Dict[str, bool] = {}
+    for market in raw_markets:
+        if not isinstance(market, dict) or not _is_neg_risk(market):
+            continue
+        event_id = _event_id(market)
+        if event_id:
+            counted[event_id] = counted.get(event_id, False) or _event_outcome_count(market) is not None
+    return [event_id for event_id, known in counted.items() if not known]
+
+
+def fetch_neg_risk_siblings(
+    event_ids: Iterable[str],
+    host: str = "https://clob.polymarket.com",
+    get: Optional[Callable[..., Any]] = None,
+    max_pages: int = MAX_LISTING_PAGES,
+) -> Dict[str, List[Dict[str, Any]]]:
+    # CLOB /markets records carry neg_risk_market_id but no event size, and
+    # the discovery listing stops at max_markets. Every sibling of an event
+    # is only known after reading the whole paged listing, so it is walked
+    # once here; a listing that fails or does not end yields nothing.
+    wanted = set(event_ids)
+    if not wanted:
+        return {}
+    if get is None:
+        import requests
+
+        get = requests.get
+    siblings: Dict[str, List[Dict[str, Any]]] = {}
+    cursor = ""
+    for _ in range(max_pages):
+        try:
+            response = get(f"{host}/markets", params={"next_cursor": cursor} if cursor else {}, timeout=10)
+            response.raise_for_status()
+            payload = response.json()
+        except Exception as exc:
+            logger.warning("Neg-risk sibling listing failed: %s", exc)
+            return {}
+        for market in _parse_markets(payload):
+            if isinstance(market, dict) and _is_neg_risk(market) and _event_id(market) in wanted:
+                siblings.setdefault(str(_event_id(market)), []).append(market)
+        cursor = str(payload.get("next_cursor") or "") if isinstance(payload, dict) else ""
+        if not cursor or cursor == END_CURSOR:
+            return siblings
+    logger.warning("Neg-risk sibling listing did not end within %d pages", max_pages)
+    return {}
+
+
+def discover_markets(
+    config: DiscoveryConfig,
+    adapter: Optional[Any] = None,
+    host: str = "https://clob.polymarket.com",
+    raw_markets: Optional[List[Dict[str, Any]]] = None,
+) -> List[MarketInfo]:
+    markets = raw_markets if raw_markets is not None else fetch_markets(config, adapter, host)
     results: List[MarketInfo] = []
     for market in markets:
         if not isinstance(market, dict):
@@ -134,7 +283,8 @@ def discover_markets(
         volume = market.get("volume") or market.get("volume_usd") or market.get("volumeUsd")
         liquidity = market.get("liquidity") or market.get("liquidity_usd") or market.get("liquidityUsd")
         category = market.get("category") or market.get("categoryLabel")
-        market_id = str(market.get("id") or market.get("market_id") or market.get("marketId") or question)
+        market_id = _market_id(market)
+        condition_id = market.get("condition_id") or market.get("conditionId")
         results.append(
             MarketInfo(
                 market_id=market_id,
@@ -144,8 +294,208 @@ def discover_markets(
                 volume=float(volume) if volume is not None else None,
                 liquidity=float(liquidity) if liquidity is not None else None,
                 category=str(category) if category is not None else None,
+                event_id=_event_id(market),
+                condition_id=str(condition_id) if condition_id else None,
+                neg_risk=_is_neg_risk(market),
             )
         )
         if len(results) >= config.max_markets:
             break
     return results
+
+
+def discover_events(
+    config: DiscoveryConfig,
+    adapter: Optional[Any] = None,
+    host: str = "https://clob.polymarket.com",
+    raw_markets: Optional[List[Dict[str, Any]]] = None,
+    siblings: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+) -> List[EventInfo]:
+    markets = raw_markets if raw_markets is not None else fetch_markets(config, adapter, host)
+
+    # Neg-risk events list one binary market per outcome; buying every YES
+    # leg of a complete event pays exactly 1. Markets with two or more
+    # non-YES/NO outcome tokens form an event on their own.
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    results: List[EventInfo] = []
+    for market in markets:
+        if not isinstance(market, dict):
+            continue
+        event_id = _event_id(market)
+        if _is_neg_risk(market) and event_id:
+            grouped.setdefault(event_id, []).append(market)
+            continue
+        yes_token_id, no_token_id = _extract_tokens(market)
+        if yes_token_id and no_token_id:
+            continue
+        tokens = _extract_outcome_tokens(market)
+        if len(tokens) < 2 or not _matches_filters(market, config):
+            continue
+        market_id = _market_id(market)
+        category = market.get("category") or market.get("categoryLabel")
+        results.append(
+            EventInfo(
+                event_id=market_id,
+                title=str(market.get("question") or market.get("title") or market.get("name") or ""),
+                outcomes=[
+                    OutcomeToken(label=label, token_id=token_id, market_id=market_id) for label, token_id in tokens
+                ],
+                category=str(category) if category is not None else None,
+            )
+        )
+
+    dropped = 0
+    for event_id, members in grouped.items():
+        # Buying every YES leg only pays 1 when every outcome is present;
+        # max_markets can leave a partial group whose smaller ask sum looks
+        # like edge. The full set comes from the listing's event size or
+        # from `siblings` (see fetch_neg_risk_siblings); otherwise the group
+        # is dropped.
+        expected = next((count for count in map(_event_outcome_count, members) if count), None)
+        if expected is None and siblings and event_id in siblings:
+            members = siblings[event_id]
+            expected = len(members)
+        if len(members) < 2 or expected != len(members):
+            dropped += 1
+            continue
+        summary = dict(members[0])
+        summary["volume"] = _sum_field(members, ("volume", "volume_usd", "volumeUsd"))
+        summary["liquidity"] = _sum_field(members, ("liquidity", "liquidity_usd", "liquidityUsd"))
+        if not _matches_filters(summary, config):
+            continue
+        outcomes: List[OutcomeToken] = []
+        for member in members:
+            yes_token_id, _ = _extract_tokens(member)
+            if not yes_token_id:
+                break
+            question = member.get("groupItemTitle") or member.get("question") or member.get("title") or ""
+            outcomes.append(OutcomeToken(label=str(question), token_id=yes_token_id, market_id=_market_id(member)))
+        else:
+            events = members[0].get("events")
+            title = None
+            if isinstance(events, list) and events and isinstance(events[0], dict):
+                title = events[0].get("title")
+            category = members[0].get("category") or members[0].get("categoryLabel")
+            results.append(
+                EventInfo(
+                    event_id=event_id,
+                    title=str(title or members[0].get("question") or event_id),
+                    outcomes=outcomes,
+                    category=str(category) if category is not None else None,
+                )
+            )
+    if dropped:
+        logger.warning("Dropped %d neg-risk events whose full outcome set is unknown", dropped)
+    return results[: config.max_markets]
+
+
+def discover_complete_events(
+    config: DiscoveryConfig,
+    raw_markets: List[Dict[str, Any]],
+    host: str = "https://clob.polymarket.com",
+) -> List[EventInfo]:
+    siblings = fetch_neg_risk_siblings(incomplete_neg_risk_events(raw_markets), host)
+    return discover_events(config, raw_markets=raw_markets, siblings=siblings)
+
+
+def _sum_field(markets: List[Dict[str, Any]], keys: Tuple[str, ...]) -> Optional[float]:
+    total = None
+    for market in markets:
+        for key in keys:
+            value = market.get(key)
+            if value is None:
+                continue
+            try:
+                total = (total or 0.0) + float(value)
+            except (TypeError, ValueError):
+                pass
+            break
+    return total
+
+
+MONTHS = {
+    name: number
+    for number, names in enumerate(
+        (
+            ("january", "jan"),
+            ("february", "feb"),
+            ("march", "mar"),
+            ("april", "apr"),
+            ("may",),
+            ("june", "jun"),
+            ("july", "jul"),
+            ("august", "aug"),
+            ("september", "sep", "sept"),
+            ("october", "oct"),
+            ("november", "nov"),
+            ("december", "dec"),
+        ),
+        start=1,
+    )
+    for name in names
+}
+
+_DEADLINE = re.compile(
+    r"\b(?P<word>by|before)\s+(?:the\s+)?(?:end\s+of\s+)?"
+    r"(?:(?P<month>[a-z]+)\.?(?:\s+(?P<day>\d{1,2})(?:st|nd|rd|th)?)?,?(?:\s+(?P<year>\d{4}))?|(?P<only_year>\d{4}))"
+    r"\s*\??\s*$"
+)
+
+
+def _deadline(question: str) -> Optional[Tuple[str, Tuple[int, int, int]]]:
+    # "Will X happen by June 30, 2026?" -> ("will x happen by {date}", (2026, 6, 30)).
+    # Only trailing "by"/"before" deadlines are parsed: those are the ones
+    # where a YES on the earlier market implies a YES on the later one.
+    text = " ".join(_normalize_text(question).split())
+    match = _DEADLINE.search(text)
+    if match is None:
+        return None
+    before = match.group("word") == "before"
+    if match.group("only_year"):
+        year = int(match.group("only_year"))
+        when = (year - 1, 12, 31) if before else (year, 12, 31)
+    else:
+        month = MONTHS.get(match.group("month") or "")
+        if month is None:
+            return None
+        year = int(match.group("year")) if match.group("year") else 0
+        if match.group("day"):
+            day = int(match.group("day")) - (1 if before else 0)
+        else:
+            day = 0 if before else 31
+        when = (year, month, day)
+    return text[: match.start()].rstrip() + " by {date}", when
+
+
+def build_related_index(markets: Iterable[MarketInfo]) -> List[RelatedGroup]:
+    # Built once per discovery from fields already on MarketInfo; no requests.
+    nested: Dict[str, List[Tuple[Tuple[int, int, int], MarketInfo]]] = {}
+    exclusive: Dict[str, List[MarketInfo]] = {}
+    same: Dict[str, List[MarketInfo]] = {}
+    for market in markets:
+        parsed = None if market.neg_risk else _deadline(market.question)
+        if parsed is not None:
+            template, when = parsed
+            # Markets from different events can share wording by accident, so
+            # the event id is part of the key when the API supplies one.
+            key = f"{market.event_id}|{template}" if market.event_id else template
+            nested.setdefault(key, []).append((when, market))
+        if market.neg_risk and market.event_id:
+            exclusive.setdefault(market.event_id, []).append(market)
+        if market.condition_id:
+            same.setdefault(market.condition_id, []).append(market)
+
+    groups: List[RelatedGroup] = []
+    for key, dated in nested.items():
+        dated.sort(key=lambda item: item[0])
+        # A year-less deadline cannot be ordered against dated siblings.
+        if len(dated) < 2 or (dated[0][0][0] == 0 and dated[-1][0][0] != 0):
+            continue
+        if len({when for when, _ in dated}) < len(dated):
+            continue
+        groups.append(RelatedGroup(kind="nested", key=key, markets=[market for _, market in dated]))
+    for kind, grouped in (("exclusive", exclusive), ("same", same)):
+        for key, members in grouped.items():
+            if len(members) >= 2:
+                groups.append(RelatedGroup(kind=kind, key=key, markets=members))
+    return groups
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .db import BotDB
+from .risk import add_daily_notional
+
+logger = logging.getLogger("bot")
+
+FILLED_STATUSES = {"filled", "matched", "complete", "completed"}
+FINAL_STATUSES = FILLED_STATUSES | {"canceled", "cancelled", "expired", "rejected"}
+
+
+@dataclass
+class TrackedOrder:
+    order_id: str
+    row_id: int
+    pair_id: int
+    token_id: str
+    price: float
+    size: float
+    filled: float = 0.0
+    status: str = "submitted"
+    interval_s: float = 0.0
+    next_poll_at: float = 0.0
+    cancel_sent: bool = False
+    final: bool = False
+    booked_cost: float = 0.0
+    trade_size: float = 0.0
+    trade_cost: float = 0.0
+    seen_trades: Set[str] = field(default_factory=set)
+
+
+@dataclass
+class OrderPair:
+    pair_id: int
+    run_id: int
+    market_id: str
+    yes_token_id: str
+    no_token_id: str
+    deadline: float
+    legs: List[TrackedOrder] = field(default_factory=list)
+
+
+def parse_order_status(payload: Any) -> Tuple[str, Optional[float], List[str]]:
+    # The payload's price is the order's limit; execution prices come from
+    # the trades listed under associate_trades.
+    if not isinstance(payload, dict):
+        return "", None, []
+    status = str(payload.get("status") or payload.get("state") or "").lower()
+    matched = payload.get("size_matched") or payload.get("sizeMatched") or payload.get("filled_size")
+    trade_ids = payload.get("associate_trades") or payload.get("associateTrades") or []
+    return (
+        status,
+        float(matched) if matched is not None else None,
+        [str(trade_id) for trade_id in trade_ids if trade_id],
+    )
+
+
+def parse_trade_fills(order_id: str, trades: List[Dict[str, Any]]) -> Tuple[float, float]:
+    # (size, cost) this order got across trades, whether it was the taker or
+    # one of the makers.
+    size = 0.0
+    cost = 0.0
+    for trade in trades:
+        if str(trade.get("taker_order_id") or "") == order_id:
+            trade_size = float(trade.get("size") or 0)
+            size += trade_size
+            cost += trade_size * float(trade.get("price") or 0)
+            continue
+        for maker in trade.get("maker_orders") or []:
+            if isinstance(maker, dict) and str(maker.get("order_id") or "") == order_id:
+                matched = float(maker.get("matched_amount") or 0)
+                size += matched
+                cost += matched * float(maker.get("price") or 0)
+    return size, cost
+
+
+class FillReconciler:
+    # Tracks every open order off the trading path: polls in batches, backs
+    # off per order while nothing changes, writes each fill increment to
+    # `fills`, books daily notional from real fills and records leg imbalance
+    # once both legs of a pair are final.
+    def __init__(
+        self,
+        adapter: Any,
+        db: BotDB,
+        poll_min_s: float,
+        poll_max_s: float,
+        order_ttl_s: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.adapter = adapter
+        self.db = db
+        self.poll_min_s = poll_min_s
+        self.poll_max_s = poll_max_s
+        self.order_ttl_s = order_ttl_s
+        self._clock = clock
+        self._pairs: Dict[int, OrderPair] = {}
+        self._next_pair_id = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.imbalance: Dict[str, float] = {}
+
+    @property
+    def open_order_count(self) -> int:
+        with self._lock:
+            return sum(1 for pair in self._pairs.values() for leg in pair.legs if not leg.final)
+
+    def has_imbalance(self, market_id: str) -> bool:
+        with self._lock:
+            return abs(self.imbalance.get(market_id, 0.0)) > 1e-9
+
+    @property
+    def pending_notional(self) -> float:
+        with self._lock:
+            legs = [leg for pair in self._pairs.values() for leg in pair.legs if not leg.final]
+            return sum((leg.size - leg.filled) * leg.price for leg in legs)
+
+    def track_pair(
+        self,
+        run_id: int,
+        market_id: str,
+        yes_token_id: str,
+        no_token_id: str,
+        legs: List[Tuple[str, int, str, float, float]],
+    ) -> None:
+        now = self._clock()
+        with self._lock:
+            self._next_pair_id += 1
+            pair = OrderPair(
+                pair_id=self._next_pair_id,
+                run_id=run_id,
+                market_id=market_id,
+                yes_token_id=yes_token_id,
+                no_token_id=no_token_id,
+                deadline=now + self.order_ttl_s,
+            )
+            for order_id, row_id, token_id, price, size in legs:
+                pair.legs.append(
+                    TrackedOrder(
+                        order_id=order_id,
+                        row_id=row_id,
+                        pair_id=pair.pair_id,
+                        token_id=token_id,
+                        price=price,
+                        size=size,
+                        interval_s=self.poll_min_s,
+                        next_poll_at=now + self.poll_min_s,
+                    )
+                )
+            self._pairs[pair.pair_id] = pair
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="fill-reconciler", daemon=True)
+        self._thread.start()
+
+    def stop(self, drain_timeout_s: float = 0.0) -> None:
+        deadline = self._clock() + drain_timeout_s
+        while self._pairs and self._clock() < deadline:
+            time.sleep(min(self.poll_min_s, 0.5))
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                delay = self.poll_once()
+            except Exception as exc:
+                logger.warning("Fill reconciler tick failed: %s", exc, extra={"throttle": True})
+                delay = self.poll_max_s
+            self._wake.wait(timeout=delay)
+            self._wake.clear()
+
+    def poll_once(self) -> float:
+        now = self._clock()
+        with self._lock:
+            due = [
+                leg for pair in self._pairs.values() for leg in pair.legs if not leg.final and leg.next_poll_at <= now
+            ]
+        if due:
+            payloads = self.adapter.get_order_statuses([leg.order_id for leg in due])
+            for leg in due:
+                self._apply(leg, payloads.get(leg.order_id), now)
+        self._expire(now)
+        self._settle()
+        with self._lock:
+            pending = [leg.next_poll_at for pair in self._pairs.values() for leg in pair.legs if not leg.final]
+        if not pending:
+            return self.poll_max_s
+        return max(min(pending) - self._clock(), 0.0)
+
+    def _apply(self, leg: TrackedOrder, payload: Any, now: float) -> None:
+        status, matched, trade_ids = parse_order_status(payload)
+        if matched is None and status in FILLED_STATUSES:
+            matched = leg.size
+        changed = False
+        if matched is not None and matched > leg.filled:
+            increment = matched - leg.filled
+            fill_price, source = self._fill_price(leg, trade_ids, matched, increment)
+            self.db.insert(
+                "fills",
+                {
+                    "order_id": leg.row_id,
+                    "token_id": leg.token_id,
+                    "price": fill_price,
+                    "size": increment,
+                    "filled_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                    "price_source": source,
+                },
+            )
+            add_daily_notional(self.db, fill_price * increment)
+            leg.booked_cost += fill_price * increment
+            leg.filled = matched
+            changed = True
+        if status and status != leg.status:
+            leg.status = status
+            self.db.update("orders", leg.row_id, {"status": status})
+            changed = True
+        if status in FINAL_STATUSES or leg.filled >= leg.size:
+            leg.final = True
+        leg.interval_s = self.poll_min_s if changed else min(leg.interval_s * 2, self.poll_max_s)
+        leg.next_poll_at = now + leg.interval_s
+
+    def _fill_price(
+        self, leg: TrackedOrder, trade_ids: List[str], matched: float, increment: float
+    ) -> Tuple[float, str]:
+        # Prices the increment from the order's trades once they cover
+        # everything matched so far, truing up any earlier increments booked
+        # at the limit; otherwise falls back to the limit price and says so
+        # in fills.price_source.
+        new_ids = [trade_id for trade_id in trade_ids if trade_id not in leg.seen_trades]
+        if new_ids:
+            try:
+                trades = self.adapter.get_trades(new_ids)
+            except Exception as exc:
+                logger.warning("Failed to load trades for %s: %s", leg.order_id, exc, extra={"throttle": True})
+            else:
+                # Trades not visible yet are asked for again next time.
+                trades = [trade for trade in trades if str(trade.get("id") or "") in new_ids]
+                leg.seen_trades.update(str(trade["id"]) for trade in trades)
+                size, cost = parse_trade_fills(leg.order_id, trades)
+                leg.trade_size += size
+                leg.trade_cost += cost
+        if leg.trade_size >= matched - 1e-9:
+            price = (leg.trade_cost - leg.booked_cost) / increment
+            if 0 < price < 1:
+                return price, "trade"
+        return leg.price, "limit"
+
+    def _expire(self, now: float) -> None:
+        with self._lock:
+            expired = [
+                leg
+                for pair in self._pairs.values()
+                if now >= pair.deadline
+                for leg in pair.legs
+                if not leg.final and not leg.cancel_sent
+            ]
+        for leg in expired:
+            try:
+                self.adapter.cancel(leg.order_id)
+            except Exception as exc:
+                logger.warning("Failed to cancel %s: %s", leg.order_id, exc)
+                continue
+            # Fills can land between the last poll and the cancel, so the leg
+            # stays open until a poll reports its terminal status and final
+            # size_matched.
+            leg.cancel_sent = True
+            leg.interval_s = self.poll_min_s
+            leg.next_poll_at = now
+
+    def _settle(self) -> None:
+        with self._lock:
+            done = [pair for pair in self._pairs.values() if all(leg.final for leg in pair.legs)]
+            for pair in done:
+                del self._pairs[pair.pair_id]
+        for pair in done:
+            yes_filled = sum(leg.filled for leg in pair.legs if leg.token_id == pair.yes_token_id)
+            no_filled = sum(leg.filled for leg in pair.legs if leg.token_id == pair.no_token_id)
+            gap = yes_filled - no_filled
+            if abs(gap) <= 1e-9:
+                continue
+            with self._lock:
+                self.imbalance[pair.market_id] = self.imbalance.get(pair.market_id, 0.0) + gap
+            self.db.insert(
+                "imbalances",
+                {
+                    "run_id": pair.run_id,
+                    "market_id": pair.market_id,
+                    "yes_token_id": pair.yes_token_id,
+                    "no_token_id": pair.no_token_id,
+                    "note": f"fill imbalance yes={yes_filled:g} no={no_filled:g}",
+                    "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                },
+            )
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import math
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from .db import TIME_COLUMNS
+from .maintenance import FILLED_STATUSES
+
+# Every query is one SQL statement filtered on an indexed time column and
+# read row by row from the cursor, so memory use does not grow with history.
+# Grouping happens inside SQLite; Python only formats the rows.
+
+FETCH_ROWS = 1000
+DEFAULT_EDGE_BANDS = (0.0, 25.0, 50.0, 100.0)
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _tables(conn: sqlite3.Connection) -> set:
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def _window(column: str, since: Optional[str], until: Optional[str]) -> Tuple[str, List[Any]]:
+    # Plain range predicates on the bare column so the time index is used.
+    return f"{column} >= ? AND {column} < ?", [since or "", until or "9999"]
+
+
+def _band_labels(bands: Sequence[float]) -> List[str]:
+    labels = [f"edge_lt_{bands[0]:g}"]
+    labels += [f"edge_{low:g}_{high:g}" for low, high in zip(bands, bands[1:])]
+    labels.append(f"edge_ge_{bands[-1]:g}")
+    return labels
+
+
+def summary_query(
+    tables: set,
+    by: str,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    run_id: Optional[int] = None,
+    bands: Sequence[float] = DEFAULT_EDGE_BANDS,
+) -> Tuple[str, List[Any]]:
+    # One UNION ALL of narrow per-table selects, grouped once. Each branch
+    # contributes to its own columns and zero elsewhere.
+    key = "run_id" if by == "run" else "market_id"
+    columns = ("opps", "sightings", "edge", "events", "related", "orders", "filled", "imbalances", "notional")
+    filled = ", ".join("?" * len(FILLED_STATUSES))
+    branches: List[Tuple[str, str, str, str, List[Any]]] = [
+        # (table, alias, key expression, values by column, extra params)
+        ("opportunity_episodes", "t", f"t.{key}", "1, t.sightings, t.peak_edge_bps, 0, 0, 0, 0, 0, 0", []),
+        ("opportunities", "t", f"t.{key}", "1, 1, t.edge_bps, 0, 0, 0, 0, 0, 0", []),
+        ("orders", "t", f"t.{key}", f"0, 0, NULL, 0, 0, 1, LOWER(t.status) IN ({filled}), 0, 0", list(FILLED_STATUSES)),
+        ("imbalances", "t", f"t.{key}", "0, 0, NULL, 0, 0, 0, 0, 1, 0", []),
+    ]
+    if by == "run":
+        # Baskets span several markets, so they only appear per run.
+        branches += [
+            ("event_opportunities", "t", "t.run_id", "0, 0, NULL, 1, 0, 0, 0, 0, 0", []),
+            ("related_opportunities", "t", "t.run_id", "0, 0, NULL, 0, 1, 0, 0, 0, 0", []),
+        ]
+
+    selects: List[str] = []
+    params: List[Any] = []
+    for table, alias, key_expr, values, extra in branches:
+        if table not in tables:
+            continue
+        condition, window = _window(f"{alias}.{TIME_COLUMNS[table]}", since, until)
+        if run_id is not None:
+            condition += f" AND {alias}.run_id = ?"
+            window.append(run_id)
+        selects.append(f"SELECT {key_expr} AS key, {values} FROM {table} {alias} WHERE {condition}")
+        params += extra + window
+    if {"fills", "orders"} <= tables:
+        # Fill notional is attributed to the order it belongs to.
+        condition, window = _window("f.filled_at", since, until)
+        if run_id is not None:
+            condition += " AND o.run_id = ?"
+            window.append(run_id)
+        selects.append(
+            f"SELECT o.{key} AS key, 0, 0, NULL, 0, 0, 0, 0, 0, f.price * f.size "
+            f"FROM fills f JOIN orders o ON o.id = f.order_id WHERE {condition}"
+        )
+        params += window
+    if not selects:
+        return "", []
+
+    # Band cuts are bound like every other value; their placeholders sit in
+    # the select list, ahead of the subquery's.
+    band_sums = ["SUM(edge < ?)"]
+    band_sums += ["SUM(edge >= ? AND edge < ?)" for _ in zip(bands, bands[1:])]
+    band_sums.append("SUM(edge >= ?)")
+    band_params: List[Any] = [bands[0]]
+    for low, high in zip(bands, bands[1:]):
+        band_params += [low, high]
+    band_params.append(bands[-1])
+    labels = _band_labels(bands)
+    body = "\n    UNION ALL ".join(selects)
+    query = f"""
+        SELECT key AS {key},
+               SUM(opps) AS opportunities,
+               SUM(sightings) AS sightings,
+               MIN(edge) AS edge_min_bps,
+               AVG(edge) AS edge_avg_bps,
+               MAX(edge) AS edge_max_bps,
+               {", ".join(f"COALESCE({expr}, 0) AS {label}" for expr, label in zip(band_sums, labels))},
+               SUM(events) AS event_opportunities,
+               SUM(related) AS related_opportunities,
+               SUM(orders) AS orders,
+               SUM(filled) AS filled_orders,
+               CASE WHEN SUM(orders) > 0 THEN 1.0 * SUM(filled) / SUM(orders) END AS fill_rate,
+               SUM(imbalances) AS imbalances,
+               SUM(notional) AS filled_notional
+        FROM (SELECT NULL AS key, {", ".join(f"NULL AS {name}" for name in columns)} WHERE 0
+              UNION ALL {body})
+        GROUP BY key ORDER BY key
+    """
+    return query, band_params + params
+
+
+def export_query(
+    tables: set,
+    table: str,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    run_id: Optional[int] = None,
+) -> Tuple[str, List[Any]]:
+    if table not in TIME_COLUMNS:
+        raise ValueError(f"cannot export {table}; choose one of {', '.join(sorted(TIME_COLUMNS))}")
+    if table not in tables:
+        return "", []
+    column = TIME_COLUMNS[table]
+    condition, params = _window(column, since, until)
+    if run_id is not None:
+        if table == "fills":
+            condition += " AND order_id IN (SELECT id FROM orders WHERE run_id = ?)"
+        elif table == "runs":
+            condition += " AND id = ?"
+        else:
+            condition += " AND run_id = ?"
+        params.append(run_id)
+    # Ordering by the indexed column lets SQLite walk the index instead of
+    # sorting the whole range first.
+    return f"SELECT * FROM {table} WHERE {condition} ORDER BY {column}", params
+
+
+def stream(conn: sqlite3.Connection, query: str, params: Sequence[Any]) -> Tuple[List[str], Iterator[sqlite3.Row]]:
+    cursor = conn.execute(query, list(params))
+    names = [description[0] for description in cursor.description]
+
+    def rows() -> Iterator[sqlite3.Row]:
+        while True:
+            batch = cursor.fetchmany(FETCH_ROWS)
+            if not batch:
+                return
+            yield from batch
+
+    return names, rows()
+
+
+def write_rows(names: List[str], rows: Iterator[sqlite3.Row], fmt: str, out: TextIO) -> int:
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(names)
+        for row in rows:
+            writer.writerow(tuple(row))
+            count += 1
+    elif fmt == "jsonl":
+        for row in rows:
+            out.write(json.dumps(dict(zip(names, row)), separators=(",", ":")) + "\n")
+            count += 1
+    else:
+        out.write("  ".join(names) + "\n")
+        for row in rows:
+            out.write("  ".join(_cell(value) for value in row) + "\n")
+            count += 1
+    return count
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.4g}" if abs(value) < 1 else f"{value:.2f}"
+    return str(value)
+
+
+def _parse_bands(text: str) -> List[float]:
+    bands = sorted(float(part) for part in text.split(",") if part.strip())
+    if not all(math.isfinite(band) for band in bands):
+        raise ValueError(f"non-finite edge band in {text}")
+    return bands
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bot report", description="Summarise or export bot.db")
+    parser.add_argument("--db", default=str(Path("data") / "bot.db"), help="Path to bot.db")
+    parser.add_argument("--by", choices=("run", "market"), default="run", help="Summary grouping")
+    parser.add_argument("--export", metavar="TABLE", help=f"Stream raw rows of one of: {', '.join(TIME_COLUMNS)}")
+    parser.add_argument("--run", type=int, help="Only this run id")
+    parser.add_argument("--since", help="Only rows at or after this ISO timestamp")
+    parser.add_argument("--until", help="Only rows before this ISO timestamp")
+    parser.add_argument("--edge-bands", default=",".join(f"{b:g}" for b in DEFAULT_EDGE_BANDS), help="Edge bps cuts")
+    parser.add_argument("--format", choices=("table", "csv", "jsonl"), default="table")
+    parser.add_argument("--out", help="Write to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"Database not found: {db_path}", file=sys.stderr)
+        return 1
+    try:
+        bands = _parse_bands(args.edge_bands)
+    except ValueError:
+        print(f"--edge-bands must be a comma list of finite numbers: {args.edge_bands}", file=sys.stderr)
+        return 1
+    if not bands:
+        print("--edge-bands needs at least one value", file=sys.stderr)
+        return 1
+
+    conn = connect(db_path)
+    try:
+        tables = _tables(conn)
+        if args.export:
+            try:
+                query, params = export_query(tables, args.export, args.since, args.until, args.run)
+            except ValueError as exc:
+                print(str(exc), file=sys.stderr)
+                return 1
+        else:
+            query, params = summary_query(tables, args.by, args.since, args.until, args.run, bands)
+        if not query:
+            print("Nothing to report", file=sys.stderr)
+            return 0
+        names, rows = stream(conn, query, params)
+        if args.out:
+            with open(args.out, "w", newline="", encoding="utf-8") as handle:
+                count = write_rows(names, rows, args.format, handle)
+            print(f"Wrote {count} rows to {args.out}", file=sys.stderr)
+        else:
+            write_rows(names, rows, args.format, sys.stdout)
+    finally:
+        conn.close()
+    return 0
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+def is_transport_failure(exc: BaseException) -> bool:
+    # Only failures that say the endpoint itself is unhealthy count toward a
+    # breaker. An HTTP status decides first: 429 and 5xx count, any other
+    # (e.g. 404 for a token without a book) is that market's problem and is
+    # left to MarketQuarantine. requests.HTTPError is an OSError, so this has
+    # to come before the type check below.
+    response = getattr(exc, "response", None)
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(response, "status_code", None)
+    if status is not None:
+        try:
+            code = int(status)
+        except (TypeError, ValueError):
+            return True
+        return code == 429 or code >= 500
+    # No status: timeouts and connection errors, raw or wrapped by the client
+    # (py_clob_client raises PolyApiException("Request exception!") with
+    # status_code None for both).
+    if isinstance(exc, (TimeoutError, ConnectionError, OSError)):
+        return True
+    return hasattr(exc, "status_code") or hasattr(exc, "response")
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 200, min_samples: int = 20) -> None:
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_s: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_s = reset_s
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_s:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._probing = False
+
+
+class MarketQuarantine:
+    def __init__(
+        self,
+        base_s: float,
+        max_s: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.base_s = base_s
+        self.max_s = max_s
+        self._clock = clock
+        self._entries: Dict[str, Tuple[int, float]] = {}
+
+    def is_quarantined(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and self._clock() < entry[1]
+
+    def record_failure(self, key: str) -> float:
+        failures = self._entries.get(key, (0, 0.0))[0] + 1
+        delay = min(self.base_s * 2 ** (failures - 1), self.max_s)
+        self._entries[key] = (failures, self._clock() + delay)
+        return delay
+
+    def record_success(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+
+def hedged_call(pool: Executor, fn: Callable[[], Any], hedge_after_s: Optional[float]) -> Any:
+    # Fire a duplicate of an idempotent read once the first attempt runs past
+    # `hedge_after_s`; whichever succeeds first wins.
+    first = pool.submit(fn)
+    if hedge_after_s is None:
+        return first.result()
+    done, _ = wait([first], timeout=hedge_after_s)
+    if done:
+        return first.result()
+    pending = {first, pool.submit(fn)}
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    assert error is not None
+    raise error
@@ -0,0 +1,476 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import signal
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .adapter_polymarket import PolymarketAdapter
+from .config import AppConfig, load_config, load_env_creds
+from .db import BotDB
+from .episodes import EpisodeTracker
+from .executor import execute_opportunity
+from .hot_reload import ConfigReloader, discovery_changes
+from .logger import setup_logging
+from .maintenance import DBMaintenance
+from .market_discovery import (
+    EventInfo,
+    MarketInfo,
+    RelatedGroup,
+    build_related_index,
+    discover_complete_events,
+    discover_markets,
+    fetch_markets,
+)
+from .reconciler import FillReconciler
+from .resilience import CircuitOpenError
+from .risk import RiskLimits
+from .scanner import scan_events, scan_market, scan_related
+
+
+LOCK_PATH = Path("data") / "bot.lock"
+
+
+def _write_lock() -> None:
+    if LOCK_PATH.exists():
+        raise RuntimeError("Lock file exists: data/bot.lock. Another instance may be running.")
+    LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
+    LOCK_PATH.write_text(str(os.getpid()), encoding="utf-8")
+
+
+def _remove_lock() -> None:
+    if LOCK_PATH.exists():
+        LOCK_PATH.unlink()
+
+
+@dataclass
+class _Session:
+    live: bool
+    config: AppConfig
+    logger: logging.Logger
+    adapter: PolymarketAdapter
+    db: BotDB
+    run_id: int
+    limits: RiskLimits
+    episodes: EpisodeTracker
+    reconciler: Optional[FillReconciler]
+    raw_markets: List[Dict[str, Any]]
+    markets: List[MarketInfo]
+    events: List[EventInfo]
+    related: List[RelatedGroup]
+    # Order books fetched during the current pass, keyed by token id. Later
+    # stages read from here instead of requesting the same book again.
+    books: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # time.monotonic() at which each cached book was fetched; a pass can
+    # span minutes once cooldowns and retries add up.
+    book_times: Dict[str, float] = field(default_factory=dict)
+
+
+def _risk_limits(config: AppConfig) -> RiskLimits:
+    return RiskLimits(
+        max_notional_per_trade=config.trading.max_notional_per_trade,
+        max_daily_notional=config.trading.max_daily_notional,
+        max_open_orders=config.trading.max_open_orders,
+        min_order_size=config.trading.min_order_size,
+    )
+
+
+def _apply_config(session: _Session, new_config: AppConfig) -> bool:
+    # Everything is computed first and swapped in together between passes, so
+    # a pass never sees half of a reload.
+    changed, refetch = discovery_changes(session.config.discovery, new_config.discovery)
+    raw_markets, markets, events, related = session.raw_markets, session.markets, session.events, session.related
+    if changed:
+        if refetch:
+            try:
+                raw_markets = fetch_markets(new_config.discovery, adapter=session.adapter, host=new_config.clob.host)
+            except Exception as exc:
+                session.logger.error("Config reload rejected, market refetch failed: %s", exc)
+                return False
+        markets = discover_markets(new_config.discovery, raw_markets=raw_markets)
+        events = []
+        if new_config.discovery.multi_outcome:
+            events = discover_complete_events(new_config.discovery, raw_markets, new_config.clob.host)
+        related = build_related_index(markets) if new_config.discovery.related_markets else []
+
+    session.config = new_config
+    session.limits = _risk_limits(new_config)
+    session.adapter.template_ttl_s = new_config.trading.template_ttl_s
+    session.episodes.price_bucket = new_config.trading.episode_price_bucket
+    session.episodes.checkpoint_s = new_config.trading.episode_checkpoint_s
+    session.raw_markets, session.markets, session.events, session.related = raw_markets, markets, events, related
+    if changed:
+        session.logger.info(
+            "Config reloaded; discovery %s (%s): %d markets, %d events, %d related groups",
+            "refetched" if refetch else "re-filtered",
+            ", ".join(changed),
+            len(markets),
+            len(events),
+            len(related),
+        )
+    else:
+        session.logger.info("Config reloaded; trading settings applied")
+    return True
+
+
+def _scan_markets(session: _Session, markets: List[MarketInfo]) -> None:
+    config = session.config
+    adapter = session.adapter
+    logger = session.logger
+    for market in markets:
+        if adapter.quarantine.is_quarantined(market.market_id):
+            continue
+        try:
+            yes_book = adapter.get_order_book(market.yes_token_id)
+            no_book = adapter.get_order_book(market.no_token_id)
+        except CircuitOpenError as exc:
+            logger.warning("Skipping %s: %s", market.market_id, exc, extra={"throttle": True})
+            continue
+        except Exception as exc:
+            delay = adapter.quarantine.record_failure(market.market_id)
+            logger.warning(
+                "Failed to load order book for %s: %s (quarantined %.0fs)",
+                market.market_id,
+                exc,
+                delay,
+                extra={"throttle": True},
+            )
+            continue
+        adapter.quarantine.record_success(market.market_id)
+        fetched_at = time.monotonic()
+        session.books[market.yes_token_id] = yes_book
+        session.books[market.no_token_id] = no_book
+        session.book_times[market.yes_token_id] = fetched_at
+        session.book_times[market.no_token_id] = fetched_at
+
+        opportunity = scan_market(
+            market,
+            yes_book,
+            no_book,
+            config.trading.fee_bps,
+            config.trading.slippage_bps,
+            config.trading.min_order_size,
+        )
+        if opportunity is None:
+            continue
+        # Warm templates only below the threshold: at or above it the lookup
+        # would sit between detection and submit. They are rebuilt every pass
+        # in the window so the pass that crosses the threshold finds them
+        # fresh (template_ttl_s > scan_interval_s).
+        window_start = config.trading.min_edge_bps - config.trading.template_window_bps
+        if session.live and window_start <= opportunity.edge_bps < config.trading.min_edge_bps:
+            try:
+                adapter.prepare_order_template(market.yes_token_id, refresh=True)
+                adapter.prepare_order_template(market.no_token_id, refresh=True)
+            except Exception as exc:
+                logger.warning("Failed to prepare order templates for %s: %s", market.market_id, exc)
+        if opportunity.edge_bps < config.trading.min_edge_bps:
+            continue
+
+        episode = session.episodes.observe(opportunity)
+        if episode.sightings == 1:
+            logger.info(
+                "Opportunity %s edge=%.2f bps cost=%.4f",
+                market.market_id,
+                opportunity.edge_bps,
+                opportunity.all_in_cost,
+            )
+
+        if session.live:
+            result = execute_opportunity(
+                adapter,
+                session.db,
+                opportunity,
+                session.limits,
+                session.run_id,
+                config.trading.max_slippage_live_bps,
+                session.reconciler,
+            )
+            logger.info(
+                "Execution result: %s (detect-to-submit %.1f ms, templated=%s)",
+                result.message,
+                result.submit_latency_ms or 0.0,
+                result.templated,
+            )
+        else:
+            logger.info("Dry run - no orders placed")
+
+        time.sleep(config.trading.cooldown_ms_per_market / 1000)
+
+
+def _scan_events(session: _Session, events: List[EventInfo]) -> None:
+    config = session.config
+    adapter = session.adapter
+    logger = session.logger
+    books = session.books
+    for event in events:
+        if adapter.quarantine.is_quarantined(event.event_id):
+            continue
+        try:
+            # Neg-risk outcomes are binary markets too, so most of these books
+            # were already fetched by _scan_markets this pass.
+            event_books = {}
+            fetched = {}
+            for outcome in event.outcomes:
+                book = books.get(outcome.token_id)
+                if book is None:
+                    book = adapter.get_order_book(outcome.token_id)
+                    fetched[outcome.token_id] = time.monotonic()
+                event_books[outcome.token_id] = book
+        except CircuitOpenError as exc:
+            logger.warning("Skipping event %s: %s", event.event_id, exc, extra={"throttle": True})
+            continue
+        except Exception as exc:
+            delay = adapter.quarantine.record_failure(event.event_id)
+            logger.warning(
+                "Failed to load order books for event %s: %s (quarantined %.0fs)",
+                event.event_id,
+                exc,
+                delay,
+                extra={"throttle": True},
+            )
+            continue
+        adapter.quarantine.record_success(event.event_id)
+        books.update(event_books)
+        session.book_times.update(fetched)
+
+    for event_opportunity in scan_events(
+        events,
+        books,
+        config.trading.fee_bps,
+        config.trading.slippage_bps,
+        config.trading.min_order_size,
+    ):
+        if event_opportunity.edge_bps < config.trading.min_edge_bps:
+            continue
+        session.db.insert(
+            "event_opportunities",
+            {
+                "run_id": session.run_id,
+                "event_id": event_opportunity.event.event_id,
+                "legs": len(event_opportunity.legs),
+                "ask_sum": sum(leg.price for leg in event_opportunity.legs),
+                "edge_bps": event_opportunity.edge_bps,
+                "depth_size": event_opportunity.depth_size,
+                "depth_cost": event_opportunity.depth_cost,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            },
+        )
+        logger.info(
+            "Event opportunity %s legs=%d edge=%.2f bps depth=%.2f",
+            event_opportunity.event.event_id,
+            len(event_opportunity.legs),
+            event_opportunity.edge_bps,
+            event_opportunity.depth_size,
+        )
+
+
+def _scan_related(session: _Session, groups: List[RelatedGroup]) -> None:
+    config = session.config
+    for opportunity in scan_related(
+        groups,
+        session.books,
+        config.trading.fee_bps,
+        config.trading.slippage_bps,
+        config.trading.min_order_size,
+        session.book_times,
+        config.trading.related_max_skew_s,
+    ):
+        if opportunity.edge_bps < config.trading.min_edge_bps:
+            continue
+        legs = ",".join(f"{side}:{market.market_id}" for market, side, _ in opportunity.legs)
+        session.db.insert(
+            "related_opportunities",
+            {
+                "run_id": session.run_id,
+                "kind": opportunity.group.kind,
+                "group_key": opportunity.group.key,
+                "legs": legs,
+                "ask_sum": sum(ask.price for _, _, ask in opportunity.legs),
+                "payout": opportunity.payout,
+                "edge_bps": opportunity.edge_bps,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            },
+        )
+        session.logger.info(
+            "Related opportunity [%s] %s legs=%s edge=%.2f bps",
+            opportunity.group.kind,
+            opportunity.group.key,
+            legs,
+            opportunity.edge_bps,
+        )
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bot", description="Polymarket YES/NO arbitrage bot")
+    parser.add_argument("--config", required=True, help="Path to config.yaml")
+    parser.add_argument("--live", action="store_true", help="Enable live trading")
+    parser.add_argument("--loop", action="store_true", help="Keep scanning every trading.scan_interval_s")
+    parser.add_argument(
+        "--watch-config", action="store_true", help="Reload config.yaml when it changes (SIGHUP always reloads)"
+    )
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    logger = setup_logging(
+        config.logging.level,
+        config.logging.jsonl,
+        max_bytes=config.logging.max_bytes,
+        rotate_interval_s=config.logging.rotate_interval_s,
+        backup_count=config.logging.backup_count,
+        compress=config.logging.compress,
+        rate_limit_per_window=config.logging.rate_limit_per_window,
+        rate_limit_window_s=config.logging.rate_limit_window_s,
+    )
+
+    try:
+        _write_lock()
+    except RuntimeError as exc:
+        logger.error(str(exc))
+        return 1
+
+    shutdown_hooks: List[Callable[[], object]] = []
+
+    def _shutdown(*_: object) -> None:
+        if config.trading.cancel_on_shutdown:
+            logger.info("Shutdown requested. Cancel-on-shutdown enabled.")
+        for hook in shutdown_hooks:
+            hook()
+        _remove_lock()
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
+
+    creds = load_env_creds()
+    has_creds = bool(creds.get("api_key") and creds.get("api_secret") and creds.get("api_passphrase"))
+    if args.live and not has_creds:
+        logger.error("Live mode requires POLYMARKET_API_KEY/SECRET/PASSPHRASE")
+        _remove_lock()
+        return 1
+
+    try:
+        adapter = PolymarketAdapter(
+            config.clob.host,
+            config.clob.chain_id,
+            creds if has_creds else None,
+            hedge_workers=config.resilience.hedge_workers,
+            breaker_failure_threshold=config.resilience.breaker_failure_threshold,
+            breaker_reset_s=config.resilience.breaker_reset_s,
+            quarantine_base_s=config.resilience.quarantine_base_s,
+            quarantine_max_s=config.resilience.quarantine_max_s,
+            template_ttl_s=config.trading.template_ttl_s,
+            status_workers=config.reconciler.status_workers if args.live else 0,
+        )
+    except Exception as exc:
+        if not args.live:
+            logger.error("need creds to read books: %s", exc)
+            _remove_lock()
+            return 1
+        raise
+
+    db = BotDB(Path("data") / "bot.db")
+    run_id = db.insert(
+        "runs",
+        {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "mode": "live" if args.live else "dry-run",
+        },
+    )
+
+    maintenance = None
+    if config.maintenance.enabled:
+        maintenance = DBMaintenance(
+            db,
+            retention_days=config.maintenance.retention_days,
+            chunk_rows=config.maintenance.chunk_rows,
+            interval_s=config.maintenance.interval_s,
+            vacuum_pages=config.maintenance.vacuum_pages,
+            # Episodes are written up to one checkpoint late and order status
+            # settles up to a TTL plus the final polls after the cancel.
+            grace_s=max(
+                config.trading.episode_checkpoint_s,
+                config.reconciler.order_ttl_s + 2 * config.reconciler.poll_max_s,
+            ),
+        )
+        maintenance.start()
+        shutdown_hooks.append(maintenance.stop)
+
+    raw_markets = fetch_markets(config.discovery, adapter=adapter, host=config.clob.host)
+    markets = discover_markets(config.discovery, raw_markets=raw_markets)
+    events = []
+    if config.discovery.multi_outcome:
+        events = discover_complete_events(config.discovery, raw_markets, config.clob.host)
+    related = build_related_index(markets) if config.discovery.related_markets else []
+    logger.info(
+        "Discovered %d markets, %d multi-outcome events, %d related groups", len(markets), len(events), len(related)
+    )
+
+    limits = _risk_limits(config)
+    episodes = EpisodeTracker(
+        db,
+        run_id,
+        price_bucket=config.trading.episode_price_bucket,
+        checkpoint_s=config.trading.episode_checkpoint_s,
+    )
+    shutdown_hooks.append(episodes.close_all)
+    reconciler = None
+    if args.live:
+        reconciler = FillReconciler(
+            adapter,
+            db,
+            poll_min_s=config.reconciler.poll_min_s,
+            poll_max_s=config.reconciler.poll_max_s,
+            order_ttl_s=config.reconciler.order_ttl_s,
+        )
+        reconciler.start()
+        shutdown_hooks.append(reconciler.stop)
+
+    session = _Session(
+        live=args.live,
+        config=config,
+        logger=logger,
+        adapter=adapter,
+        db=db,
+        run_id=run_id,
+        limits=limits,
+        episodes=episodes,
+        reconciler=reconciler,
+        raw_markets=raw_markets,
+        markets=markets,
+        events=events,
+        related=related,
+    )
+    reloader = ConfigReloader(args.config, config, watch=args.watch_config)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, reloader.request)
+    while True:
+        session.books = {}
+        session.book_times = {}
+        _scan_markets(session, session.markets)
+        _scan_events(session, session.events)
+        _scan_related(session, session.related)
+        closed = episodes.end_pass()
+        if closed:
+            logger.info("Closed %d opportunity episodes (%d open)", len(closed), episodes.open_count)
+        if not args.loop:
+            break
+        time.sleep(session.config.trading.scan_interval_s)
+        new_config = reloader.poll()
+        if new_config is not None:
+            if _apply_config(session, new_config):
+                reloader.commit(new_config)
+
+    episodes.close_all()
+    if reconciler is not None:
+        reconciler.stop(drain_timeout_s=config.reconciler.order_ttl_s + config.reconciler.poll_max_s)
+    if maintenance is not None:
+        maintenance.stop()
+    adapter.close()
+    _remove_lock()
+    return 0
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import math
+import time
+from array import array
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
-from .market_discovery import MarketInfo
+from .market_discovery import EventInfo, MarketInfo, RelatedGroup
 
 
 @dataclass
@@ -19,30 +22,66 @@ class Opportunity:
     no: OrderBookTop
     edge_bps: float
     all_in_cost: float
+    detected_at: float = 0.0
+
+
+@dataclass
+class EventOpportunity:
+    event: EventInfo
+    legs: List[OrderBookTop]
+    edge_bps: float
+    all_in_cost: float
+    depth_size: float
+    depth_cost: float
+
+
+@dataclass
+class RelatedOpportunity:
+    group: RelatedGroup
+    # (market, side, top ask) for every leg of the basket.
+    legs: List[Tuple[MarketInfo, str, OrderBookTop]]
+    payout: float
+    edge_bps: float
+    all_in_cost: float
+
+
+def _parse_level(level: Any) -> Tuple[float, float]:
+    if isinstance(level, dict):
+        return float(level.get("price") or level.get("p") or 0), float(level.get("size") or level.get("s") or 0)
+    price, size = level
+    return float(price), float(size)
 
 
 def _parse_top_ask(order_book: Dict[str, Any]) -> Optional[OrderBookTop]:
     asks = order_book.get("asks") or order_book.get("ask") or []
     if not asks:
         return None
-    top = asks[0]
-    if isinstance(top, dict):
-        price = float(top.get("price") or top.get("p") or 0)
-        size = float(top.get("size") or top.get("s") or 0)
-    else:
-        price, size = top
+    price, size = _parse_level(asks[0])
     if price <= 0 or size <= 0:
         return None
     return OrderBookTop(price=price, size=size)
 
 
+def _parse_asks(order_book: Dict[str, Any]) -> List[OrderBookTop]:
+    levels = []
+    for level in order_book.get("asks") or order_book.get("ask") or []:
+        price, size = _parse_level(level)
+        if price > 0 and size > 0:
+            levels.append(OrderBookTop(price=price, size=size))
+    levels.sort(key=lambda top: top.price)
+    return levels
+
+
 def compute_edge_bps(
     yes_price: float,
     no_price: float,
     fee_bps: float,
     slippage_bps: float,
 ) -> float:
-    cost = yes_price + no_price
+    return _basket_edge_bps(yes_price + no_price, fee_bps, slippage_bps)
+
+
+def _basket_edge_bps(cost: float, fee_bps: float, slippage_bps: float) -> float:
     fees = cost * fee_bps / 10000
     slippage = cost * slippage_bps / 10000
     all_in = cost + fees + slippage
@@ -66,4 +105,179 @@ def scan_market(
         return None
     edge = compute_edge_bps(yes_top.price, no_top.price, fee_bps, slippage_bps)
     all_in = yes_top.price + no_top.price + (yes_top.price + no_top.price) * (fee_bps + slippage_bps) / 10000
-    return Opportunity(market=market, yes=yes_top, no=no_top, edge_bps=edge, all_in_cost=all_in)
+    return Opportunity(
+        market=market,
+        yes=yes_top,
+        no=no_top,
+        edge_bps=edge,
+        all_in_cost=all_in,
+        detected_at=time.perf_counter(),
+    )
+
+
+def _walk_depth(ladders: Sequence[List[OrderBookTop]], multiplier: float) -> Tuple[float, float]:
+    # Take size from every leg at once while the marginal basket still costs
+    # less than the 1.0 payout after fees and slippage.
+    index = [0] * len(ladders)
+    remaining = [ladder[0].size for ladder in ladders]
+    size = 0.0
+    cost = 0.0
+    while True:
+        marginal = math.fsum(ladder[i].price for ladder, i in zip(ladders, index))
+        if marginal * multiplier >= 1.0:
+            return size, cost
+        step = min(remaining)
+        size += step
+        cost += marginal * step
+        for leg, ladder in enumerate(ladders):
+            remaining[leg] -= step
+            if remaining[leg] <= 1e-12:
+                index[leg] += 1
+                if index[leg] >= len(ladder):
+                    return size, cost
+                remaining[leg] = ladder[index[leg]].size
+
+
+def scan_events(
+    events: Sequence[EventInfo],
+    books: Dict[str, Dict[str, Any]],
+    fee_bps: float,
+    slippage_bps: float,
+    min_order_size: float,
+) -> List[EventOpportunity]:
+    # Columnar pass: top asks of every leg go into one flat array with per-event
+    # offsets, so the sum-of-asks screen is a single sweep over all events and
+    # only events that clear it pay for the depth walk.
+    candidates: List[Tuple[EventInfo, List[List[OrderBookTop]]]] = []
+    prices = array("d")
+    offsets = array("l", [0])
+    for event in events:
+        ladders = []
+        for outcome in event.outcomes:
+            book = books.get(outcome.token_id)
+            ladder = _parse_asks(book) if book is not None else []
+            if not ladder or ladder[0].size < min_order_size:
+                break
+            ladders.append(ladder)
+        else:
+            candidates.append((event, ladders))
+            prices.extend(ladder[0].price for ladder in ladders)
+            offsets.append(len(prices))
+
+    multiplier = 1 + (fee_bps + slippage_bps) / 10000
+    results: List[EventOpportunity] = []
+    for position, (event, ladders) in enumerate(candidates):
+        cost = math.fsum(prices[offsets[position] : offsets[position + 1]])
+        depth_size, depth_cost = (0.0, 0.0)
+        if cost * multiplier < 1.0:
+            depth_size, depth_cost = _walk_depth(ladders, multiplier)
+        results.append(
+            EventOpportunity(
+                event=event,
+                legs=[ladder[0] for ladder in ladders],
+                edge_bps=_basket_edge_bps(cost, fee_bps, slippage_bps),
+                all_in_cost=cost * multiplier,
+                depth_size=depth_size,
+                depth_cost=depth_cost,
+            )
+        )
+    return results
+
+
+_Leg = Tuple[MarketInfo, str, OrderBookTop]
+
+
+def _legs_cost(legs: List[_Leg]) -> float:
+    return math.fsum(ask.price for _, _, ask in legs)
+
+
+def _cheapest_pair(
+    ordered: Sequence[MarketInfo], top: Callable[[str], Optional[OrderBookTop]]
+) -> Optional[List[_Leg]]:
+    # One pass: for each market, pair its YES with the cheapest NO seen on
+    # any market before it.
+    best: Optional[List[_Leg]] = None
+    cheapest_no: Optional[Tuple[MarketInfo, OrderBookTop]] = None
+    for market in ordered:
+        yes = top(market.yes_token_id)
+        if yes is not None and cheapest_no is not None:
+            if best is None or cheapest_no[1].price + yes.price < _legs_cost(best):
+                best = [(cheapest_no[0], "NO", cheapest_no[1]), (market, "YES", yes)]
+        no = top(market.no_token_id)
+        if no is not None and (cheapest_no is None or no.price < cheapest_no[1].price):
+            cheapest_no = (market, no)
+    return best
+
+
+def _legs_skew(legs: Sequence[_Leg], fetched_at: Dict[str, float]) -> float:
+    times = []
+    for market, side, _ in legs:
+        fetched = fetched_at.get(market.yes_token_id if side == "YES" else market.no_token_id)
+        if fetched is None:
+            return math.inf
+        times.append(fetched)
+    return max(times) - min(times)
+
+
+def scan_related(
+    groups: Sequence[RelatedGroup],
+    books: Dict[str, Dict[str, Any]],
+    fee_bps: float,
+    slippage_bps: float,
+    min_order_size: float,
+    fetched_at: Optional[Dict[str, float]] = None,
+    max_skew_s: Optional[float] = None,
+) -> List[RelatedOpportunity]:
+    # Checks consistency across linked markets using only books the pass has
+    # already fetched. Each token's top ask is parsed once even when the
+    # market sits in several groups; groups with a missing book are skipped,
+    # and so are groups whose legs were fetched more than max_skew_s apart.
+    tops: Dict[str, Optional[OrderBookTop]] = {}
+
+    def top(token_id: str) -> Optional[OrderBookTop]:
+        if token_id not in tops:
+            book = books.get(token_id)
+            ask = _parse_top_ask(book) if book is not None else None
+            tops[token_id] = ask if ask is not None and ask.size >= min_order_size else None
+        return tops[token_id]
+
+    multiplier = 1 + (fee_bps + slippage_bps) / 10000
+    results: List[RelatedOpportunity] = []
+    for group in groups:
+        legs: Optional[List[_Leg]] = None
+        payout = 1.0
+        if group.kind == "exclusive":
+            # At most one member resolves YES, so NO on every member pays at
+            # least n - 1.
+            legs = []
+            for market in group.markets:
+                ask = top(market.no_token_id)
+                if ask is None:
+                    legs = None
+                    break
+                legs.append((market, "NO", ask))
+            payout = float(len(group.markets) - 1)
+        else:
+            # YES on a later deadline plus NO on an earlier one pays at least
+            # 1 in every outcome. Members of one condition are interchangeable,
+            # so their pairs are searched in both orders.
+            legs = _cheapest_pair(group.markets, top)
+            if group.kind == "same":
+                reverse = _cheapest_pair(group.markets[::-1], top)
+                if reverse is not None and (legs is None or _legs_cost(reverse) < _legs_cost(legs)):
+                    legs = reverse
+        if not legs or payout <= 0:
+            continue
+        if fetched_at is not None and max_skew_s is not None and _legs_skew(legs, fetched_at) > max_skew_s:
+            continue
+        cost = _legs_cost(legs)
+        results.append(
+            RelatedOpportunity(
+                group=group,
+                legs=legs,
+                payout=payout,
+                edge_bps=_basket_edge_bps(cost / payout, fee_bps, slippage_bps),
+                all_in_cost=cost * multiplier,
+            )
+        )
+    return results
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import math
+import sqlite3
+import sys
+import time
+from array import array
+from bisect import bisect_right
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .config import load_config
+
+
+@dataclass
+class OpportunityColumns:
+    cost: array
+    size: array
+    day: array
+    days: List[str]
+
+    def __len__(self) -> int:
+        return len(self.cost)
+
+
+@dataclass
+class SweepResult:
+    fee_bps: float
+    slippage_bps: float
+    min_edge_bps: float
+    min_order_size: float
+    trades: int
+    notional: float
+    daily_utilization: float
+    expected_edge_usd: float
+    mean_edge_bps: float
+    # The config trades rows the recording config would not have logged, so
+    # history under-counts its trades.
+    extrapolated: bool = False
+
+
+def load_columns(db_path: Path, since: Optional[str] = None, until: Optional[str] = None) -> OpportunityColumns:
+    # Episodes carry their best YES/NO asks and largest observed size; legacy
+    # per-sighting rows have no size, so they never fail a size filter.
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    query = """
+        SELECT yes_ask + no_ask, max_size, started_at AS t FROM opportunity_episodes
+        WHERE started_at >= ? AND started_at < ?
+        UNION ALL
+        SELECT yes_ask + no_ask, NULL, created_at AS t FROM opportunities
+        WHERE created_at >= ? AND created_at < ?
+        ORDER BY t
+    """
+    lower = since or ""
+    upper = until or "9999"
+    columns = OpportunityColumns(cost=array("d"), size=array("d"), day=array("l"), days=[])
+    day_index: Dict[str, int] = {}
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if not {"opportunity_episodes", "opportunities"} <= tables:
+            return columns
+        for cost, size, created_at in conn.execute(query, [lower, upper, lower, upper]):
+            if cost is None:
+                continue
+            day = str(created_at or "")[:10]
+            if day not in day_index:
+                day_index[day] = len(columns.days)
+                columns.days.append(day)
+            columns.cost.append(float(cost))
+            columns.size.append(float(size) if size is not None else math.inf)
+            columns.day.append(day_index[day])
+    finally:
+        conn.close()
+    return columns
+
+
+def sweep(
+    columns: OpportunityColumns,
+    fee_bps_values: Sequence[float],
+    slippage_bps_values: Sequence[float],
+    min_edge_bps_values: Sequence[float],
+    min_order_size_values: Sequence[float],
+    max_notional_per_trade: float,
+    max_daily_notional: float,
+    recorded_bound: Optional[float] = None,
+) -> List[SweepResult]:
+    # A row trades when its all-in cost clears min_edge_bps exactly as in
+    # compute_edge_bps, which reduces to YES+NO cost <= a per-config bound.
+    # Per day, rows are kept sorted by cost with prefix sums, so a bound
+    # costs one bisect per day; only days where the daily cap binds are
+    # replayed in time order.
+    results: List[SweepResult] = []
+    n_days = max(len(columns.days), 1)
+    for min_size in min_order_size_values:
+        by_day: List[List[float]] = [[] for _ in columns.days]
+        for cost, size, day in zip(columns.cost, columns.size, columns.day):
+            if size >= min_size:
+                by_day[day].append(cost)
+        sorted_days = [sorted(costs) for costs in by_day]
+        prefixes = [list(itertools.accumulate(costs, initial=0.0)) for costs in sorted_days]
+
+        # Fee and slippage only enter through their sum, so many grid points
+        # share a cost bound and are evaluated once.
+        by_bound: Dict[float, Tuple[int, float]] = {}
+        for fee_bps, slippage_bps, min_edge_bps in itertools.product(
+            fee_bps_values, slippage_bps_values, min_edge_bps_values
+        ):
+            multiplier = 1 + (fee_bps + slippage_bps) / 10000
+            bound = cost_bound(fee_bps, slippage_bps, min_edge_bps)
+            if min_size > 0:
+                bound = min(bound, max_notional_per_trade / min_size)
+            if bound not in by_bound:
+                by_bound[bound] = _take(by_day, sorted_days, prefixes, bound, min_size, max_daily_notional)
+            trades, cost_sum = by_bound[bound]
+            extrapolated = recorded_bound is not None and bound > recorded_bound + 1e-12
+            notional = cost_sum * min_size
+            edge_usd = (trades - multiplier * cost_sum) * min_size
+            results.append(
+                SweepResult(
+                    fee_bps=fee_bps,
+                    slippage_bps=slippage_bps,
+                    min_edge_bps=min_edge_bps,
+                    min_order_size=min_size,
+                    trades=trades,
+                    notional=notional,
+                    daily_utilization=notional / (n_days * max_daily_notional) if max_daily_notional else 0.0,
+                    expected_edge_usd=edge_usd,
+                    mean_edge_bps=edge_usd / notional * 10000 if notional else 0.0,
+                    extrapolated=extrapolated,
+                )
+            )
+    return results
+
+
+def cost_bound(fee_bps: float, slippage_bps: float, min_edge_bps: float) -> float:
+    # Largest YES+NO cost that still clears min_edge_bps after fee and slippage.
+    return (1 - min_edge_bps / 10000) / (1 + (fee_bps + slippage_bps) / 10000)
+
+
+def _take(
+    by_day: List[List[float]],
+    sorted_days: List[List[float]],
+    prefixes: List[List[float]],
+    bound: float,
+    min_size: float,
+    max_daily_notional: float,
+) -> Tuple[int, float]:
+    trades = 0
+    cost_sum = 0.0
+    for chronological, ordered, prefix in zip(by_day, sorted_days, prefixes):
+        count = bisect_right(ordered, bound)
+        if prefix[count] * min_size <= max_daily_notional:
+            trades += count
+            cost_sum += prefix[count]
+            continue
+        used = 0.0
+        floor = ordered[0] * min_size
+        for cost in chronological:
+            if cost <= bound and used + cost * min_size <= max_daily_notional:
+                used += cost * min_size
+                trades += 1
+                cost_sum += cost
+                if max_daily_notional - used < floor:
+                    break
+    return trades, cost_sum
+
+
+def parse_grid(text: str) -> List[float]:
+    # "50,100,150" or "start:stop:step" (stop inclusive).
+    values: List[float] = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if ":" in part:
+            start, stop, step = (float(piece) for piece in part.split(":"))
+            if step <= 0:
+                raise ValueError(f"grid step must be positive: {part}")
+            count = int(math.floor((stop - start) / step + 1e-9)) + 1
+            values.extend(round(start + i * step, 10) for i in range(max(count, 0)))
+        else:
+            values.append(float(part))
+    return values
+
+
+def _write_csv(path: Path, results: Iterable[SweepResult]) -> None:
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=list(SweepResult.__dataclass_fields__))
+        writer.writeheader()
+        for result in results:
+            writer.writerow(asdict(result))
+
+
+def _print_table(results: Sequence[SweepResult], out=sys.stdout) -> None:
+    header = ("fee", "slip", "min_edge", "min_size", "trades", "notional", "util", "edge_usd", "edge_bps")
+    out.write("{:>7} {:>7} {:>9} {:>9} {:>8} {:>11} {:>6} {:>10} {:>9}\n".format(*header))
+    for r in results:
+        out.write(
+            f"{r.fee_bps:>7g} {r.slippage_bps:>7g} {r.min_edge_bps:>9g} {r.min_order_size:>9g} {r.trades:>8d} "
+            f"{r.notional:>11.2f} {r.daily_utilization:>6.1%} {r.expected_edge_usd:>10.2f} {r.mean_edge_bps:>9.1f}"
+            f"{' *' if r.extrapolated else ''}\n"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bot sweep", description="Offline trading parameter sweep")
+    parser.add_argument("--config", help="config.yaml supplying defaults and risk limits")
+    parser.add_argument("--db", default=str(Path("data") / "bot.db"), help="Path to bot.db")
+    parser.add_argument("--fee-bps", help="Grid, e.g. 50,100 or 0:200:25")
+    parser.add_argument("--slippage-bps", help="Grid")
+    parser.add_argument("--min-edge-bps", help="Grid")
+    parser.add_argument("--min-order-size", help="Grid")
+    parser.add_argument("--since", help="Only rows at or after this ISO timestamp")
+    parser.add_argument("--until", help="Only rows before this ISO timestamp")
+    parser.add_argument("--top", type=int, default=20, help="Rows to print, best expected edge first")
+    parser.add_argument("--csv", help="Write every combination to this CSV file")
+    args = parser.parse_args(argv)
+
+    trading = load_config(args.config).trading
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"Database not found: {db_path}", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    columns = load_columns(db_path, args.since, args.until)
+    loaded = time.perf_counter()
+    grid: Tuple[List[float], ...] = (
+        parse_grid(args.fee_bps) if args.fee_bps else [trading.fee_bps],
+        parse_grid(args.slippage_bps) if args.slippage_bps else [trading.slippage_bps],
+        parse_grid(args.min_edge_bps) if args.min_edge_bps else [trading.min_edge_bps],
+        parse_grid(args.min_order_size) if args.min_order_size else [trading.min_order_size],
+    )
+    # History only holds rows that cleared the live thresholds, taken here
+    # from the config as the best guess at what was running when it was
+    # recorded.
+    recorded_bound = cost_bound(trading.fee_bps, trading.slippage_bps, trading.min_edge_bps)
+    results = sweep(
+        columns, *grid, trading.max_notional_per_trade, trading.max_daily_notional, recorded_bound=recorded_bound
+    )
+    finished = time.perf_counter()
+
+    results.sort(key=lambda result: result.expected_edge_usd, reverse=True)
+    print(
+        f"{len(columns)} opportunities over {len(columns.days)} days; {len(results)} configs "
+        f"(load {loaded - started:.2f}s, sweep {finished - loaded:.2f}s)"
+    )
+    _print_table(results[: args.top])
+    extrapolated = sum(result.extrapolated for result in results)
+    print(
+        "Note: episodes are priced at their peak-edge asks, so edge and trade counts are optimistic.",
+        file=sys.stderr,
+    )
+    if extrapolated:
+        print(
+            f"Note: {extrapolated} configs (*) are looser than the recording thresholds; history has no rows "
+            "between the two, so their trades are under-counted.",
+            file=sys.stderr,
+        )
+    if args.csv:
+        _write_csv(Path(args.csv), results)
+    return 0
@@ -0,0 +1,56 @@
+import time
+
+from bot.adapter_polymarket import OrderTemplate, PolymarketAdapter
+
+
+def test_order_template_fill_rounds_to_tick():
+    template = OrderTemplate(
+        token_id="1",
+        tick_size="0.01",
+        neg_risk=False,
+        base={"token_id": "1", "side": "BUY", "type": "LIMIT"},
+    )
+    order = template.fill(0.4200000001, 5)
+    assert order == {"token_id": "1", "side": "BUY", "type": "LIMIT", "price": "0.42", "size": "5"}
+    assert template.base == {"token_id": "1", "side": "BUY", "type": "LIMIT"}
+
+
+def test_order_template_expires():
+    template = OrderTemplate(token_id="1", tick_size="0.01", neg_risk=False, created_at=100.0)
+    assert template.is_fresh(159.0, ttl_s=60)
+    assert not template.is_fresh(160.0, ttl_s=60)
+
+
+class FakeClient:
+    def __init__(self):
+        self.orders = []
+        self.lookups = 0
+
+    def get_tick_size(self, token_id):
+        self.lookups += 1
+        return "0.01"
+
+    def get_neg_risk(self, token_id):
+        self.lookups += 1
+        return False
+
+    def create_order(self, order, options=None):
+        self.orders.append(order)
+        return {"order_id": f"o{len(self.orders)}", "status": "live"}
+
+
+def test_warmed_template_is_used_on_a_later_pass():
+    client = FakeClient()
+    adapter = PolymarketAdapter("host", 137, hedge_workers=0, status_workers=0, template_ttl_s=180, client=client)
+    adapter.prepare_order_template("1", refresh=True)
+    lookups = client.lookups
+
+    result = adapter.place_limit_buy("1", 0.4200000001, 5)
+    assert result.templated
+    assert client.lookups == lookups
+    assert client.orders[-1]["price"] == "0.42"
+
+    # Older than the TTL: dropped, order goes out untemplated.
+    adapter._templates["1"].created_at = time.monotonic() - 181
+    assert not adapter.place_limit_buy("1", 0.42, 5).templated
+    assert "1" not in adapter._templates
@@ -0,0 +1,32 @@
+from bot.db import BotDB
+from bot.episodes import EpisodeTracker
+from bot.market_discovery import MarketInfo
+from bot.scanner import OrderBookTop, Opportunity
+
+
+def _opportunity(yes, no, edge, size=10):
+    market = MarketInfo("m1", "Q?", "y", "n", None, None, None)
+    return Opportunity(market, OrderBookTop(yes, size), OrderBookTop(no, size), edge, yes + no)
+
+
+def test_episode_coalesces_sightings_and_writes_once(tmp_path):
+    db = BotDB(tmp_path / "bot.db")
+    now = [0.0]
+    tracker = EpisodeTracker(db, run_id=1, price_bucket=0.01, checkpoint_s=3600, clock=lambda: now[0])
+
+    tracker.observe(_opportunity(0.45, 0.45, 100))
+    tracker.end_pass()
+    now[0] = 1.0
+    tracker.observe(_opportunity(0.45, 0.451, 300, size=25))
+    tracker.end_pass()
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM opportunity_episodes", [])["n"] == 0
+
+    now[0] = 2.0
+    [closed] = tracker.end_pass()
+    assert closed.sightings == 2
+    assert closed.peak_edge_bps == 300
+    assert closed.mean_edge_bps == 200
+    row = db.fetch_one("SELECT * FROM opportunity_episodes", [])
+    assert row["sightings"] == 2
+    assert row["max_size"] == 25
+    assert row["ended_at"] == "1970-01-01T00:00:01Z"
@@ -0,0 +1,50 @@
+import pytest
+
+from bot.config import load_config, validate_config
+from bot.hot_reload import ConfigReloader, discovery_changes
+
+
+def test_reloader_applies_trading_and_freezes_restart_sections(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("trading:\n  min_edge_bps: 10\n", encoding="utf-8")
+    current = load_config(str(path))
+    reloader = ConfigReloader(str(path), current)
+    assert reloader.poll() is None
+
+    path.write_text("trading:\n  min_edge_bps: 40\nclob:\n  chain_id: 1\n", encoding="utf-8")
+    reloader.request()
+    new_config = reloader.poll()
+    assert new_config.trading.min_edge_bps == 40
+    assert new_config.clob == current.clob
+    # Rejected by the caller: the same file is offered again on the next reload.
+    reloader.request()
+    assert reloader.poll() == new_config
+    reloader.commit(new_config)
+
+    path.write_text("trading:\n  min_order_size: 0\n", encoding="utf-8")
+    reloader.request()
+    assert reloader.poll() is None
+    assert reloader.current.trading.min_edge_bps == 40
+
+
+def test_discovery_changes_refetch_only_for_fetch_fields():
+    old = load_config(None).discovery
+    new = load_config(None).discovery
+    new.exclude_keywords = ["test"]
+    assert discovery_changes(old, new) == (["exclude_keywords"], False)
+    new.max_markets = 500
+    assert discovery_changes(old, new)[1] is True
+
+
+def test_validate_config_rejects_bad_values():
+    config = load_config(None)
+    config.trading.fee_bps = -1
+    with pytest.raises(ValueError):
+        validate_config(config)
+
+
+def test_validate_config_rejects_template_ttl_within_scan_interval():
+    config = load_config(None)
+    config.trading.template_ttl_s = config.trading.scan_interval_s
+    with pytest.raises(ValueError, match="template_ttl_s"):
+        validate_config(config)
@@ -0,0 +1,31 @@
+import json
+import logging
+
+from bot.logger import JsonlFormatter, RateLimitFilter
+
+
+def _record(msg, level=logging.WARNING, created=1000.0):
+    record = logging.LogRecord("bot", level, __file__, 1, msg, ("m1",), None)
+    record.created = created
+    record.throttle = True
+    return record
+
+
+def test_rate_limit_filter_suppresses_and_reports():
+    limiter = RateLimitFilter(limit=2, window_s=60)
+    passed = [limiter.filter(_record("Failed to load order book for %s")) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+    assert limiter.filter(_record("Failed to load order book for %s", level=logging.ERROR))
+    later = _record("Failed to load order book for %s", created=1061.0)
+    assert limiter.filter(later)
+    assert later.suppressed == 3
+    unthrottled = _record("Opportunity %s")
+    unthrottled.throttle = False
+    assert all(limiter.filter(unthrottled) for _ in range(5))
+
+
+def test_jsonl_formatter_uses_record_time():
+    line = JsonlFormatter().format(_record("hello %s", created=0.25))
+    payload = json.loads(line)
+    assert payload["time"] == "1970-01-01T00:00:00.250Z"
+    assert payload["message"] == "hello m1"
@@ -0,0 +1,69 @@
+from bot.db import BotDB
+from bot.maintenance import DBMaintenance, _parse_iso
+
+
+def _episode(db, market_id, started_at, edge, sightings):
+    db.insert(
+        "opportunity_episodes",
+        {
+            "market_id": market_id,
+            "peak_edge_bps": edge,
+            "sightings": sightings,
+            "started_at": started_at,
+            "ended_at": started_at,
+        },
+    )
+
+
+def test_rollups_then_prune_and_vacuum(tmp_path):
+    db = BotDB(tmp_path / "bot.db")
+    old_run = db.insert("runs", {"started_at": "2025-12-31T00:00:00Z", "mode": "paper"})
+    live_run = db.insert("runs", {"started_at": "2026-01-01T00:00:00Z", "mode": "paper"})
+    for edge in (10, 20, 30, 40):
+        _episode(db, "m1", "2026-01-01T10:15:00Z", edge, 2)
+    _episode(db, "m1", "2026-01-03T10:15:00Z", 50, 1)
+    db.insert(
+        "orders", {"run_id": old_run, "market_id": "m1", "status": "MATCHED", "created_at": "2026-01-01T10:20:00Z"}
+    )
+    db.insert("orders", {"market_id": "m1", "status": "canceled", "created_at": "2026-01-01T10:21:00Z"})
+
+    now = _parse_iso("2026-01-03T12:00:00Z")
+    maintenance = DBMaintenance(
+        db, retention_days=1, chunk_rows=2, interval_s=60, vacuum_pages=10, clock=lambda: now
+    )
+    while maintenance.run_step():
+        pass
+
+    hourly = db.fetch_one("SELECT * FROM rollup_hourly WHERE bucket = '2026-01-01T10:00:00Z'", [])
+    assert (hourly["opportunities"], hourly["sightings"]) == (4, 8)
+    assert hourly["edge_p50_bps"] == 25
+    assert hourly["edge_max_bps"] == 40
+    assert hourly["fill_rate"] == 0.5
+    daily = db.fetch_one("SELECT * FROM rollup_daily WHERE bucket = '2026-01-01T00:00:00Z'", [])
+    assert daily["opportunities"] == 4
+
+    remaining = db.fetch_all("SELECT started_at FROM opportunity_episodes", [])
+    assert [row["started_at"] for row in remaining] == ["2026-01-03T10:15:00Z"]
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM orders", [])["n"] == 0
+    # The old run goes once its orders are pruned; the newest run stays.
+    assert [row["id"] for row in db.fetch_all("SELECT id FROM runs", [])] == [live_run]
+
+
+def test_rollup_waits_for_late_rows(tmp_path):
+    db = BotDB(tmp_path / "bot.db")
+    now = [_parse_iso("2026-01-01T11:05:00Z")]
+    maintenance = DBMaintenance(
+        db, retention_days=0, chunk_rows=10, interval_s=60, vacuum_pages=0, grace_s=600, clock=lambda: now[0]
+    )
+    _episode(db, "m1", "2026-01-01T10:30:00Z", 10, 1)
+    while maintenance.run_step():
+        pass
+    assert db.fetch_all("SELECT * FROM rollup_hourly", []) == []
+
+    # Started at 10:59, first written at its 11:06 checkpoint.
+    _episode(db, "m1", "2026-01-01T10:59:00Z", 20, 1)
+    now[0] = _parse_iso("2026-01-01T11:10:00Z")
+    while maintenance.run_step():
+        pass
+    hourly = db.fetch_one("SELECT * FROM rollup_hourly WHERE bucket = '2026-01-01T10:00:00Z'", [])
+    assert hourly["opportunities"] == 2
@@ -1,4 +1,16 @@
-from bot.market_discovery import _extract_tokens, _parse_markets
+from bot.config import DiscoveryConfig
+import logging
+
+from bot.market_discovery import (
+    MarketInfo,
+    _extract_tokens,
+    _parse_markets,
+    build_related_index,
+    discover_events,
+    fetch_neg_risk_siblings,
+    incomplete_neg_risk_events,
+)
+from bot.scanner import scan_events
 
 
 def test_extract_tokens_direct_fields():
@@ -24,3 +36,120 @@ def test_parse_markets_shapes():
     assert list(_parse_markets([{ "id": 1 }]))[0]["id"] == 1
     assert list(_parse_markets({"data": [{"id": 2}]}))[0]["id"] == 2
     assert list(_parse_markets({"markets": [{"id": 3}]}))[0]["id"] == 3
+
+
+def _discovery_config():
+    return DiscoveryConfig(
+        max_markets=10,
+        min_volume_usd=0,
+        exclude_keywords=[],
+        include_keywords=[],
+        categories=[],
+        min_liquidity=0,
+        only_active=True,
+        multi_outcome=True,
+        related_markets=True,
+    )
+
+
+def _neg_risk_market(market_id, yes, no, listed):
+    return {
+        "id": market_id,
+        "neg_risk": True,
+        "neg_risk_market_id": "ev",
+        "yes_token_id": yes,
+        "no_token_id": no,
+        "events": [{"id": "ev", "markets": [{"id": m} for m in listed]}],
+    }
+
+
+def test_discover_events_groups_neg_risk_markets():
+    config = _discovery_config()
+    raw = [
+        _neg_risk_market("a", "1", "2", ["a", "b"]),
+        _neg_risk_market("b", "3", "4", ["a", "b"]),
+        {"id": "c", "tokens": [{"outcome": "Lakers", "token_id": "5"}, {"outcome": "Celtics", "token_id": "6"}]},
+        {"id": "d", "question": "Binary", "yes_token_id": "7", "no_token_id": "8"},
+    ]
+    events = {event.event_id: event for event in discover_events(config, raw_markets=raw)}
+    assert set(events) == {"ev", "c"}
+    assert [outcome.token_id for outcome in events["ev"].outcomes] == ["1", "3"]
+    assert [outcome.label for outcome in events["c"].outcomes] == ["Lakers", "Celtics"]
+
+
+def test_discover_events_drops_incomplete_neg_risk_events():
+    config = _discovery_config()
+    # Two of three outcomes listed: their asks sum to 0.40, which is not an edge.
+    raw = [
+        _neg_risk_market("a", "1", "2", ["a", "b", "c"]),
+        _neg_risk_market("b", "3", "4", ["a", "b", "c"]),
+        {"id": "x", "neg_risk": True, "neg_risk_market_id": "ev2", "yes_token_id": "5", "no_token_id": "6"},
+        {"id": "y", "neg_risk": True, "neg_risk_market_id": "ev2", "yes_token_id": "7", "no_token_id": "8"},
+    ]
+    events = discover_events(config, raw_markets=raw)
+    assert events == []
+    books = {token: {"asks": [[0.20, 10]]} for token in ("1", "3")}
+    assert scan_events(events, books, fee_bps=0, slippage_bps=0, min_order_size=1) == []
+
+
+def test_build_related_index_links_deadlines_and_neg_risk_events():
+    def market(market_id, question, **kwargs):
+        return MarketInfo(market_id, question, f"{market_id}y", f"{market_id}n", None, None, None, **kwargs)
+
+    markets = [
+        market("dec", "Will X happen by December 31, 2026?"),
+        market("jun", "Will X happen by June 30, 2026?"),
+        market("other", "Will Y happen by June 30, 2026?"),
+        market("a", "Candidate A?", event_id="ev", neg_risk=True),
+        market("b", "Candidate B?", event_id="ev", neg_risk=True),
+    ]
+    groups = {group.kind: group for group in build_related_index(markets)}
+    assert set(groups) == {"nested", "exclusive"}
+    assert [m.market_id for m in groups["nested"].markets] == ["jun", "dec"]
+    assert [m.market_id for m in groups["exclusive"].markets] == ["a", "b"]
+
+
+def _clob_market(market_id, yes, no, event_id="ev"):
+    # Shape of a CLOB /markets record: neg-risk id, no event list or count.
+    return {"id": market_id, "neg_risk": True, "neg_risk_market_id": event_id, "yes_token_id": yes, "no_token_id": no}
+
+
+class FakePage:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+def test_clob_neg_risk_events_completed_from_full_listing(caplog):
+    config = _discovery_config()
+    raw = [_clob_market("a", "1", "2"), _clob_market("b", "3", "4")]
+    with caplog.at_level(logging.WARNING, logger="bot"):
+        assert discover_events(config, raw_markets=raw) == []
+    assert "Dropped 1 neg-risk events" in caplog.text
+
+    pages = {
+        "": {"data": [_clob_market("a", "1", "2"), {"id": "z"}], "next_cursor": "MQ=="},
+        "MQ==": {"data": [_clob_market("b", "3", "4"), _clob_market("c", "5", "6")], "next_cursor": "LTE="},
+    }
+    requested = []
+
+    def get(url, params, timeout):
+        requested.append(params.get("next_cursor", ""))
+        return FakePage(pages[params.get("next_cursor", "")])
+
+    siblings = fetch_neg_risk_siblings(incomplete_neg_risk_events(raw), get=get)
+    assert requested == ["", "MQ=="]
+    [event] = discover_events(config, raw_markets=raw, siblings=siblings)
+    assert [outcome.token_id for outcome in event.outcomes] == ["1", "3", "5"]
+
+
+def test_unfinished_listing_completes_nothing():
+    def get(url, params, timeout):
+        return FakePage({"data": [_clob_market("a", "1", "2")], "next_cursor": "more"})
+
+    assert fetch_neg_risk_siblings(["ev"], get=get, max_pages=3) == {}
@@ -0,0 +1,87 @@
+from bot.adapter_polymarket import OrderResult
+from bot.db import BotDB
+from bot.executor import execute_opportunity
+from bot.market_discovery import MarketInfo
+from bot.reconciler import FillReconciler
+from bot.risk import RiskLimits
+from bot.scanner import Opportunity, OrderBookTop
+
+
+class FakeAdapter:
+    def __init__(self):
+        self.statuses = {}
+        self.trades = {}
+        self.canceled = []
+
+    def get_trades(self, trade_ids):
+        return [self.trades[trade_id] for trade_id in trade_ids if trade_id in self.trades]
+
+    def get_order_statuses(self, order_ids):
+        return {order_id: self.statuses[order_id] for order_id in order_ids if order_id in self.statuses}
+
+    def cancel(self, order_id):
+        self.canceled.append(order_id)
+
+    def place_limit_buy(self, token_id, price, size):
+        return OrderResult(f"o-{token_id}", "live")
+
+
+def test_reconciler_records_partial_fills_and_imbalance(tmp_path):
+    db = BotDB(tmp_path / "bot.db")
+    adapter = FakeAdapter()
+    now = [0.0]
+    reconciler = FillReconciler(adapter, db, poll_min_s=1, poll_max_s=8, order_ttl_s=10, clock=lambda: now[0])
+    reconciler.track_pair(1, "m1", "y", "n", [("o-yes", 1, "y", 0.45, 10), ("o-no", 2, "n", 0.45, 10)])
+    assert reconciler.open_order_count == 2
+
+    # o-yes filled 4 at 0.44 as taker; its payload price is only the limit.
+    adapter.trades["t1"] = {"id": "t1", "taker_order_id": "o-yes", "price": "0.44", "size": "4"}
+    adapter.statuses = {
+        "o-yes": {"status": "LIVE", "size_matched": "4", "price": "0.45", "associate_trades": ["t1"]},
+        "o-no": {"status": "MATCHED", "size_matched": "10"},
+    }
+    now[0] = 1.0
+    reconciler.poll_once()
+    # Trade not visible yet: the increment is booked at the limit price.
+    adapter.statuses["o-yes"] = {"status": "LIVE", "size_matched": "6", "associate_trades": ["t1", "t2"]}
+    now[0] = 2.0
+    reconciler.poll_once()
+    now[0] = 10.0
+    reconciler.poll_once()
+    assert adapter.canceled == ["o-yes"]
+    assert reconciler.open_order_count == 1
+
+    # One more share filled before the cancel took effect; by now both trades
+    # are visible, so the increment is priced from them.
+    adapter.trades["t2"] = {"id": "t2", "maker_orders": [{"order_id": "o-yes", "matched_amount": "3", "price": "0.43"}]}
+    adapter.statuses["o-yes"] = {"status": "CANCELED", "size_matched": "7", "associate_trades": ["t1", "t2"]}
+    reconciler.poll_once()
+
+    assert adapter.canceled == ["o-yes"]
+    assert reconciler.open_order_count == 0
+    assert reconciler.imbalance == {"m1": -3.0}
+    fills = db.fetch_one("SELECT COUNT(*) AS n, SUM(size) AS size FROM fills WHERE token_id = 'y'", [])
+    assert (fills["n"], fills["size"]) == (3, 7)
+    notional = db.fetch_one("SELECT notional FROM daily_notional", [])["notional"]
+    assert round(notional, 6) == round(4 * 0.44 + 3 * 0.43 + 10 * 0.45, 6)
+
+    sources = [row["price_source"] for row in db.fetch_all("SELECT price_source FROM fills WHERE token_id = 'y'", [])]
+    assert sources == ["trade", "limit", "trade"]
+
+
+def test_executor_sizes_notional_and_skips_imbalanced_markets(tmp_path):
+    db = BotDB(tmp_path / "bot.db")
+    reconciler = FillReconciler(FakeAdapter(), db, poll_min_s=1, poll_max_s=8, order_ttl_s=10)
+    market = MarketInfo("m1", "q", "y", "n", None, None, None)
+    opportunity = Opportunity(market, OrderBookTop(0.45, 100), OrderBookTop(0.5, 100), 500, 0.95)
+    limits = RiskLimits(max_notional_per_trade=10, max_daily_notional=100, max_open_orders=10, min_order_size=20)
+
+    # 20 shares of a 0.95 pair is 19 of notional, above the per-trade cap.
+    result = execute_opportunity(FakeAdapter(), db, opportunity, limits, 1, 50, reconciler)
+    assert result.message == "risk limits exceeded"
+
+    limits.max_notional_per_trade = 20
+    assert execute_opportunity(FakeAdapter(), db, opportunity, limits, 1, 50, reconciler).success
+    reconciler.imbalance["m1"] = 5.0
+    result = execute_opportunity(FakeAdapter(), db, opportunity, limits, 1, 50, reconciler)
+    assert result.message == "open imbalance on market"
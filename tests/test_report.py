@@ -0,0 +1,62 @@
+import json
+
+from bot.db import BotDB
+from bot.report import connect, export_query, main, summary_query, _tables
+
+
+def _seed(path):
+    db = BotDB(path)
+    run_id = db.insert("runs", {"started_at": "2026-01-01T00:00:00Z", "mode": "live"})
+    for edge, started_at in ((10, "2026-01-01T00:01:00Z"), (60, "2026-01-01T00:02:00Z"), (80, "2026-02-01T00:00:00Z")):
+        db.insert(
+            "opportunity_episodes",
+            {"run_id": run_id, "market_id": "m1", "peak_edge_bps": edge, "sightings": 2, "started_at": started_at},
+        )
+    for status in ("filled", "canceled"):
+        order_id = db.insert(
+            "orders", {"run_id": run_id, "market_id": "m1", "status": status, "created_at": "2026-01-01T00:03:00Z"}
+        )
+    db.insert("fills", {"order_id": order_id - 1, "price": 0.4, "size": 10, "filled_at": "2026-01-01T00:04:00Z"})
+    db.insert("imbalances", {"run_id": run_id, "market_id": "m1", "created_at": "2026-01-01T00:05:00Z"})
+    db.close()
+
+
+def test_report_summary_respects_time_window(tmp_path):
+    path = tmp_path / "bot.db"
+    _seed(path)
+    out = tmp_path / "runs.jsonl"
+    assert main(["--db", str(path), "--until", "2026-01-31", "--format", "jsonl", "--out", str(out)]) == 0
+    [row] = [json.loads(line) for line in out.read_text().splitlines()]
+    assert row["run_id"] == 1
+    assert row["opportunities"] == 2 and row["sightings"] == 4
+    assert (row["edge_0_25"], row["edge_50_100"]) == (1, 1)
+    assert row["orders"] == 2 and row["fill_rate"] == 0.5
+    assert row["imbalances"] == 1
+    assert row["filled_notional"] == 4.0
+
+
+def test_report_queries_use_time_indexes(tmp_path):
+    path = tmp_path / "bot.db"
+    _seed(path)
+    conn = connect(path)
+    tables = _tables(conn)
+    query, params = summary_query(tables, "market", "2026-01-01", "2026-02-01")
+    plan = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params))
+    assert "SCAN t" not in plan and "USING INDEX idx_opportunity_episodes_started_at" in plan
+
+    query, params = export_query(tables, "opportunity_episodes", "2026-01-01", "2026-02-01")
+    plan = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params))
+    assert "idx_opportunity_episodes_started_at" in plan and "TEMP B-TREE" not in plan
+    conn.close()
+
+    out = tmp_path / "episodes.csv"
+    assert main(["--db", str(path), "--export", "opportunity_episodes", "--format", "csv", "--out", str(out)]) == 0
+    assert len(out.read_text().splitlines()) == 4
+
+
+def test_report_rejects_bad_edge_bands(tmp_path, capsys):
+    path = tmp_path / "bot.db"
+    _seed(path)
+    for bands in ("0,nan", "inf", "0,abc"):
+        assert main(["--db", str(path), "--edge-bands", bands]) == 1
+        assert "--edge-bands" in capsys.readouterr().err
@@ -0,0 +1,92 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from bot.resilience import CircuitBreaker, MarketQuarantine, hedged_call, is_transport_failure
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_circuit_breaker_opens_and_probes():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_s=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock.now = 10
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_market_quarantine_backoff():
+    clock = FakeClock()
+    quarantine = MarketQuarantine(base_s=5, max_s=12, clock=clock)
+    assert quarantine.record_failure("m") == 5
+    assert quarantine.is_quarantined("m")
+    assert quarantine.record_failure("m") == 10
+    assert quarantine.record_failure("m") == 12
+    clock.now = 13
+    assert not quarantine.is_quarantined("m")
+
+
+def test_hedged_call_returns_faster_duplicate():
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.5)
+            return "slow"
+        return "fast"
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        assert hedged_call(pool, fetch, hedge_after_s=0.01) == "fast"
+
+
+class HttpError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class PolyApiException(Exception):
+    # Shape of py_clob_client's error: wraps timeouts and connection errors
+    # with status_code None.
+    def __init__(self, resp=None, error_msg=None):
+        self.status_code = resp.status_code if resp is not None else None
+        self.error_msg = error_msg
+
+
+def test_only_transport_failures_trip_breakers():
+    assert is_transport_failure(TimeoutError())
+    assert is_transport_failure(ConnectionResetError())
+    assert is_transport_failure(HttpError(503))
+    assert is_transport_failure(HttpError(429))
+    assert not is_transport_failure(HttpError(404))
+    assert not is_transport_failure(KeyError("asks"))
+
+
+def test_client_exception_shapes():
+    assert is_transport_failure(PolyApiException(error_msg="Request exception!"))
+    bad_request = requests.Response()
+    bad_request.status_code = 400
+    assert not is_transport_failure(PolyApiException(resp=bad_request, error_msg="invalid token id"))
+
+    not_found = requests.Response()
+    not_found.status_code = 404
+    assert not is_transport_failure(requests.HTTPError(response=not_found))
+    unavailable = requests.Response()
+    unavailable.status_code = 502
+    assert is_transport_failure(requests.HTTPError(response=unavailable))
+    assert is_transport_failure(requests.ConnectTimeout())
+    assert is_transport_failure(requests.ConnectionError())
@@ -1,4 +1,5 @@
-from bot.scanner import _parse_top_ask, compute_edge_bps
+from bot.market_discovery import EventInfo, MarketInfo, OutcomeToken, RelatedGroup
+from bot.scanner import _parse_top_ask, compute_edge_bps, scan_events, scan_related
 
 
 def test_parse_top_ask_dict():
@@ -18,3 +19,51 @@ def test_parse_top_ask_tuple():
 def test_compute_edge_bps():
     edge = compute_edge_bps(0.45, 0.45, fee_bps=100, slippage_bps=50)
     assert edge < 1000
+
+
+def test_scan_events_sum_of_asks_with_depth():
+    event = EventInfo(
+        event_id="e1",
+        title="Who wins?",
+        outcomes=[OutcomeToken(label=str(i), token_id=str(i), market_id=str(i)) for i in range(3)],
+        category=None,
+    )
+    books = {
+        "0": {"asks": [[0.30, 5], [0.40, 10]]},
+        "1": {"asks": [[0.30, 10]]},
+        "2": {"asks": [[0.35, 2], [0.30, 8]]},
+    }
+    [opportunity] = scan_events([event], books, fee_bps=0, slippage_bps=0, min_order_size=1)
+    assert [leg.price for leg in opportunity.legs] == [0.30, 0.30, 0.30]
+    assert round(opportunity.edge_bps) == 1000
+    assert opportunity.depth_size == 5
+    assert round(opportunity.depth_cost, 6) == 4.5
+
+
+def test_scan_related_nested_and_exclusive_groups():
+    jun, dec, later = (MarketInfo(i, i, f"{i}y", f"{i}n", None, None, None) for i in ("jun", "dec", "later"))
+    books = {
+        "juny": {"asks": [[0.50, 10]]},
+        "junn": {"asks": [[0.45, 10]]},
+        "decy": {"asks": [[0.50, 10]]},
+        "decn": {"asks": [[0.55, 10]]},
+        # Only one side of "later" was fetched; it must not be requested.
+        "latery": {"asks": [[0.40, 10]]},
+    }
+    nested = RelatedGroup(kind="nested", key="x", markets=[jun, dec, later])
+    exclusive = RelatedGroup(kind="exclusive", key="ev", markets=[jun, dec])
+    missing = RelatedGroup(kind="exclusive", key="ev2", markets=[jun, later])
+    by_key = {r.group.key: r for r in scan_related([nested, exclusive, missing], books, 0, 0, 1)}
+
+    assert set(by_key) == {"x", "ev"}
+    # NO on the June market plus YES on the latest one: 0.45 + 0.40.
+    assert [(m.market_id, side) for m, side, _ in by_key["x"].legs] == [("jun", "NO"), ("later", "YES")]
+    assert round(by_key["x"].edge_bps) == 1500
+    # Two exclusive members: NO + NO pays 1, costs 1.00.
+    assert by_key["ev"].payout == 1.0
+    assert round(by_key["ev"].edge_bps) == 0
+
+    # Legs fetched 40s apart are not priced together; 2s apart are.
+    fetched_at = {"juny": 0.0, "junn": 0.0, "decy": 2.0, "decn": 2.0, "latery": 40.0}
+    by_key = {r.group.key: r for r in scan_related([nested, exclusive], books, 0, 0, 1, fetched_at, 5)}
+    assert set(by_key) == {"ev"}
@@ -0,0 +1,46 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY = ("requests", "py_clob_client", "web3", "sqlite3", "bot.runner", "bot.adapter_polymarket")
+
+
+def _loaded_after(code):
+    probe = f"import sys\n{code}\nprint(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return [name for name in result.stdout.strip().split(",") if name]
+
+
+def test_cli_entrypoint_imports_nothing_heavy():
+    assert _loaded_after("import bot.__main__") == []
+
+
+def test_check_config_stays_light(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text("trading:\n  min_edge_bps: 5\n", encoding="utf-8")
+    code = (
+        "import contextlib, io\n"
+        "from bot.__main__ import main\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        f"    assert main(['check-config', '--config', {str(config)!r}]) == 0"
+    )
+    assert _loaded_after(code) == []
+
+
+def test_check_config_reports_malformed_yaml(tmp_path, capsys):
+    from bot.commands import check_config
+
+    config = tmp_path / "config.yaml"
+    config.write_text("trading: [unclosed\n", encoding="utf-8")
+    assert check_config(["--config", str(config)]) == 1
+    assert "Config invalid" in capsys.readouterr().err
+
+
+def test_cli_cold_start_time():
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "bot", "sweep", "--help"], cwd=ROOT, capture_output=True, check=True)
+    assert time.perf_counter() - started < 3.0
@@ -0,0 +1,34 @@
+from array import array
+
+from bot.scanner import compute_edge_bps
+from bot.sweep import OpportunityColumns, cost_bound, parse_grid, sweep
+
+
+def test_parse_grid():
+    assert parse_grid("50,100") == [50, 100]
+    assert parse_grid("0:100:25") == [0, 25, 50, 75, 100]
+
+
+def test_sweep_matches_edge_semantics_and_daily_cap():
+    columns = OpportunityColumns(
+        cost=array("d", [0.90, 0.95, 0.80, 0.97]),
+        size=array("d", [10, 10, 2, 10]),
+        day=array("l", [0, 0, 0, 1]),
+        days=["2026-01-01", "2026-01-02"],
+    )
+    [loose, strict] = sweep(columns, [100], [50], [0, 400], [5], 100, 1000)
+    expected = [cost for cost in (0.90, 0.95, 0.97) if compute_edge_bps(cost, 0, 100, 50) >= 0]
+    assert loose.trades == len(expected) == 3
+    assert strict.trades == sum(compute_edge_bps(cost, 0, 100, 50) >= 400 for cost in expected)
+
+    [capped] = sweep(columns, [0], [0], [0], [5], 100, 4.6)
+    assert capped.trades == 1
+    assert round(capped.notional, 6) == 4.5
+    assert round(capped.expected_edge_usd, 6) == 0.5
+
+
+def test_sweep_flags_configs_looser_than_recording():
+    columns = OpportunityColumns(cost=array("d", [0.90]), size=array("d", [10]), day=array("l", [0]), days=["d"])
+    recorded = cost_bound(100, 50, 20)
+    tighter, same, looser = sweep(columns, [100], [50], [40, 20, 0], [5], 100, 1000, recorded_bound=recorded)
+    assert (tighter.extrapolated, same.extrapolated, looser.extrapolated) == (False, False, True)